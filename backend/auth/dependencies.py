@@ -2,18 +2,30 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
 from backend.auth.auth_utils import decode_access_token
+from backend.auth.user_cache import current_revision, user_cache
 from backend.db.user_repository import get_user_by_username
+from backend.monitoring.metrics import stage
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Cache misses use a short session of their own: a request-scoped one would hold
+# a pooled connection and its read snapshot until a streamed answer finishes.
 def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = decode_access_token(token)
+        with stage("auth_jwt"):
+            payload = decode_access_token(token)
         username = payload.get("sub")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = get_user_by_username(username)
+    with stage("auth_user_lookup"):
+        user = user_cache.get(username)
+        if user is None:
+            revision = current_revision()
+            user = get_user_by_username(username)
+            if user:
+                user_cache.put(user, revision)
+
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
@@ -1,9 +1,77 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Changing the work factor rehashes each user's password on their next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt releases the GIL, so a small dedicated thread pool runs hashes in parallel
+# without occupying the request threadpool.
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+# Logins allowed to run or wait for a hashing thread before new ones are rejected.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5.0"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+class PasswordQueueFullError(RuntimeError):
+    pass
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+# Returns (valid, new_hash); new_hash is set when the stored hash uses an old work factor.
+def verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+# Hashes many passwords across all cores (bulk imports) on a pool of its own, so an
+# import does not queue ahead of interactive logins.
+def hash_passwords(passwords: List[str]) -> List[str]:
+    with ThreadPoolExecutor(
+        max_workers=os.cpu_count() or 1,
+        thread_name_prefix="bcrypt-bulk",
+    ) as executor:
+        return list(executor.map(hash_password, passwords))
+
+
+async def _run_in_hash_pool(fn, *args):
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordQueueFullError("Password hashing queue is full")
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_slots.release()
+
+
+async def ahash_password(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def averify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await _run_in_hash_pool(verify_and_update, plain, hashed)
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from backend.db.database import DATA_DIR
+from backend.models.user import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+# Touched on every user change; its mtime is the user table revision all processes share.
+USER_REVISION_PATH = Path(os.getenv("USER_REVISION_PATH", str(DATA_DIR / "users.revision")))
+
+
+# Revision of the user table, or None when it cannot be read (nothing is cached then).
+def current_revision() -> Optional[int]:
+    try:
+        return USER_REVISION_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+    except OSError:
+        return None
+
+
+# Strictly increasing even when two changes land within the clock's resolution.
+def _bump_revision() -> None:
+    previous = current_revision() or 0
+    USER_REVISION_PATH.touch()
+    stamp = max(time.time_ns(), previous + 1)
+    os.utime(USER_REVISION_PATH, ns=(stamp, stamp))
+
+
+# Short-lived cache of authenticated users so get_current_user skips SQLite on
+# most requests. An entry is only served while the shared revision file is
+# unchanged since the lookup that filled it, and user_repository bumps that file
+# on every create/update/delete, so a deleted or demoted user loses access at
+# once in every process (gunicorn workers, the init_db CLI); a hit costs one stat.
+class UserCache:
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[User]:
+        revision = current_revision()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+
+            user, stored_revision, expires_at = entry
+            if revision is None or stored_revision != revision or expires_at < time.monotonic():
+                del self._entries[username]
+                return None
+
+            self._entries.move_to_end(username)
+            return user
+
+    # `revision` is current_revision() read before the database lookup, so a change
+    # committed while the lookup ran leaves the entry stale instead of serving it.
+    def put(self, user: User, revision: Optional[int]) -> None:
+        if self.ttl <= 0 or revision is None:
+            return
+
+        with self._lock:
+            self._entries[user.username] = (user, revision, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # Call after the change is committed.
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self._entries.pop(username, None)
+        _bump_revision()
+
+    # Drops this process's entries only.
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
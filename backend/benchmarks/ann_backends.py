@@ -0,0 +1,193 @@
+# Chroma vs the FAISS backends on synthetic role-tagged vectors: build time,
+# index bytes per vector, recall@k against exact filtered search, p50/p99 query
+# latency and RSS of the serving process ("+store": growth from opening the
+# store and serving the queries). Each build and each query phase runs in
+# its own process, the query phase against the persisted (memory-mapped) index.
+# Run from the repo root:
+#   python -m backend.benchmarks.ann_backends [--n 100000] [--backends chroma flat hnsw_sq8 ivfpq]
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEPARTMENTS = ["finance", "marketing", "hr", "engineering", "general"]
+ROLES = ["finance", "marketing", "hr", "engineering", "employees", "c_level"]
+
+
+# Current resident set (includes touched pages of memory-mapped index files);
+# falls back to the peak where /proc is unavailable.
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Clustered unit vectors, so ANN structure matters the way it does for real text.
+def make_data(root: Path, n: int, dim: int, queries: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(16, n // 500), dim)).astype(np.float32)
+
+    vectors = centers[rng.integers(len(centers), size=n)] + 0.3 * rng.normal(size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    picked = centers[rng.integers(len(centers), size=queries)] + 0.3 * rng.normal(size=(queries, dim))
+    picked /= np.linalg.norm(picked, axis=1, keepdims=True)
+
+    np.save(root / "vectors.npy", vectors.astype(np.float32))
+    np.save(root / "queries.npy", picked.astype(np.float32))
+    np.save(root / "departments.npy", rng.integers(len(DEPARTMENTS), size=n))
+
+
+def exact_top_k(root: Path, k: int) -> list:
+    from backend.rag.rbac import ROLE_DOCUMENT_MAP
+
+    vectors = np.load(root / "vectors.npy")
+    departments = np.asarray(DEPARTMENTS)[np.load(root / "departments.npy")]
+    truth = []
+
+    for i, query in enumerate(np.load(root / "queries.npy")):
+        role = ROLES[i % len(ROLES)]
+        visible = np.flatnonzero(np.isin(departments, ROLE_DOCUMENT_MAP[role]))
+        distances = ((vectors[visible] - query) ** 2).sum(axis=1)
+        truth.append(visible[np.argsort(distances)[:k]].tolist())
+
+    return truth
+
+
+def build(root: Path) -> dict:
+    from langchain_core.documents import Document
+
+    from backend.rag.rbac import roles_for_department, role_metadata
+    from backend.rag.vector_store import save_vector_store, upsert_embedded
+
+    vectors = np.load(root / "vectors.npy")
+    departments = np.load(root / "departments.npy")
+
+    start = time.perf_counter()
+    for i in range(0, len(vectors), 10000):
+        documents = [
+            Document(
+                page_content=f"synthetic chunk {j}",
+                metadata={
+                    "chunk_id": f"synthetic::chunk_{j}",
+                    "source_path": "synthetic",
+                    "department": DEPARTMENTS[d],
+                    "accessible_roles": ",".join(roles_for_department(DEPARTMENTS[d])),
+                    **role_metadata(DEPARTMENTS[d]),
+                },
+            )
+            for j, d in enumerate(departments[i:i + 10000], start=i)
+        ]
+        upsert_embedded(documents, vectors[i:i + 10000])
+    save_vector_store()
+
+    return {"build_s": time.perf_counter() - start}
+
+
+def query(root: Path, k: int) -> dict:
+    from backend.rag.retriever import dense_search_with_scores
+    from backend.rag.vector_store import get_vector_store
+
+    baseline = rss_mb()
+    vector_store = get_vector_store()
+    queries = np.load(root / "queries.npy")
+    latencies, found = [], []
+
+    for i, q in enumerate(queries):
+        start = time.perf_counter()
+        results = dense_search_with_scores(vector_store, "", ROLES[i % len(ROLES)], k, embedding=q.tolist())
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append([int(doc.metadata["chunk_id"].rsplit("_", 1)[1]) for doc, _ in results])
+
+    rss = rss_mb()
+    return {
+        "found": found,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "rss_mb": rss,
+        "rss_delta_mb": rss - baseline,
+    }
+
+
+def run_child(root: Path, backend: str, phase: str, k: int) -> dict:
+    env = dict(os.environ, DATA_DIR=str(root / backend), HYBRID_SEARCH="false")
+    if backend == "chroma":
+        env["VECTOR_BACKEND"] = "chroma"
+    else:
+        env.update(VECTOR_BACKEND="faiss", FAISS_INDEX_TYPE=backend)
+
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "backend.benchmarks.ann_backends",
+            "--run", phase, "--data", str(root), "--k", str(k),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def index_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file() and "docstore" not in f.name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=["chroma", "flat", "hnsw_sq8", "ivfpq"])
+    parser.add_argument("--run", choices=["build", "query"], help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        root = Path(args.data)
+        report = build(root) if args.run == "build" else query(root, args.k)
+        print(json.dumps(report))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"{args.n} vectors x {args.dim} dims, {args.queries} queries, k={args.k}\n")
+        make_data(root, args.n, args.dim, args.queries)
+        truth = exact_top_k(root, args.k)
+
+        print(
+            f"{'backend':<10} {'build s':>8} {'B/vector':>9} {'recall@k':>9} "
+            f"{'p50 ms':>7} {'p99 ms':>7} {'RSS MB':>7} {'+store':>7}"
+        )
+        for backend in args.backends:
+            built = run_child(root, backend, "build", args.k)
+            served = run_child(root, backend, "query", args.k)
+
+            recall = np.mean([
+                len(set(found) & set(expected)) / len(expected)
+                for found, expected in zip(served["found"], truth)
+                if expected
+            ])
+            print(
+                f"{backend:<10} {built['build_s']:>8.1f} "
+                f"{index_bytes(root / backend) / args.n:>9.0f} {recall:>9.3f} "
+                f"{served['p50_ms']:>7.2f} {served['p99_ms']:>7.2f} "
+                f"{served['rss_mb']:>7.0f} {served['rss_delta_mb']:>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Per-request cost of get_current_user with and without the user cache.
+# Run from the repo root:  python -m backend.benchmarks.auth_overhead [--iterations 2000]
+import argparse
+import statistics
+import time
+
+from backend.auth.auth_utils import create_access_token
+from backend.auth.dependencies import get_current_user
+from backend.auth.user_cache import user_cache
+from backend.db.database import Base, engine
+from backend.db.user_repository import create_user, delete_user
+
+USERNAME = "auth_bench_user"
+
+
+def measure(token: str, iterations: int, cached: bool):
+    samples = []
+    for _ in range(iterations):
+        if not cached:
+            user_cache.clear()
+        start = time.perf_counter()
+        get_current_user(token)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_user(USERNAME, "employees", "bench-password")
+    token = create_access_token({"sub": USERNAME, "role": "employees"})
+
+    try:
+        get_current_user(token)  # warm up imports and the connection pool
+        for name, cached in (("SQLite lookup (before)", False), ("user cache (after)", True)):
+            p50, p99 = measure(token, args.iterations, cached)
+            print(f"{name:<24} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+    finally:
+        delete_user(USERNAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Prompt size with and without context packing on the labelled eval set.
+# Run from the repo root after a rebuild:
+#   python -m backend.benchmarks.context_packing [--k 5 15] [--budget 1500]
+import argparse
+import statistics
+import time
+
+from backend.benchmarks.hybrid_retrieval import is_relevant, load_eval_set
+from backend.llm.prompt_templates import build_prompt
+from backend.rag.context_packer import CONTEXT_TOKEN_BUDGET, pack_context
+from backend.rag.model_registry import get_tokenizer
+from backend.rag.retriever import secure_search_with_scores
+from backend.rag.vector_store import get_vector_store
+
+
+def count_tokens(text: str) -> int:
+    return len(get_tokenizer()(text, add_special_tokens=False)["input_ids"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 15])
+    parser.add_argument("--budget", type=int, default=CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    cases = load_eval_set()
+    vector_store = get_vector_store()
+
+    print(f"{len(cases)} labelled queries, budget {args.budget} tokens\n")
+    print(
+        f"{'k':>3} {'raw tokens':>11} {'packed':>8} {'saved':>7} "
+        f"{'raw hit':>8} {'packed hit':>11} {'pack ms':>8}"
+    )
+
+    for k in args.k:
+        raw_tokens, packed_tokens, raw_hits, packed_hits, pack_ms = [], [], [], [], []
+
+        for case in cases:
+            results = secure_search_with_scores(vector_store, case["query"], case["role"], k)
+            raw = [doc for doc, _ in results]
+
+            start = time.perf_counter()
+            packed, _ = pack_context(results, args.budget)
+            pack_ms.append((time.perf_counter() - start) * 1000)
+
+            raw_tokens.append(count_tokens(build_prompt(case["query"], raw)))
+            packed_tokens.append(count_tokens(build_prompt(case["query"], packed)))
+            raw_hits.append(any(is_relevant(doc, case) for doc in raw))
+            packed_hits.append(any(is_relevant(doc, case) for doc in packed))
+
+        raw_mean = statistics.mean(raw_tokens)
+        packed_mean = statistics.mean(packed_tokens)
+        print(
+            f"{k:>3} {raw_mean:>11.0f} {packed_mean:>8.0f} "
+            f"{1 - packed_mean / raw_mean:>6.0%} "
+            f"{statistics.mean(raw_hits):>8.2f} {statistics.mean(packed_hits):>11.2f} "
+            f"{statistics.mean(pack_ms):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
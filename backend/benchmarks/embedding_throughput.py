@@ -0,0 +1,48 @@
+# Corpus-build embedding throughput (chunks/sec) across worker counts.
+# Run from the repo root:  python -m backend.benchmarks.embedding_throughput [--repeat 20]
+import argparse
+import os
+import time
+
+from backend.rag.embedding_engine import EMBED_BATCH_SIZE, EmbeddingEngine
+from backend.rag.pipeline import BASE_DATA_PATH
+from backend.rag.preprocessing import preprocess
+from backend.rag.vector_store import get_embeddings
+
+
+def worker_counts(max_workers: int):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20, help="replicate the corpus N times")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    directories = [d for d in BASE_DATA_PATH.iterdir() if d.is_dir()]
+    texts = [d.page_content for d in preprocess(directories)["documents"]] * args.repeat
+    print(f"{len(texts)} chunks, batch size {args.batch_size}\n")
+
+    start = time.perf_counter()
+    get_embeddings().embed_documents(texts)
+    baseline = len(texts) / (time.perf_counter() - start)
+    print(f"{'single process':<24} {baseline:>10.1f} chunks/s")
+
+    for workers in worker_counts(os.cpu_count() or 1):
+        with EmbeddingEngine(batch_size=args.batch_size, workers=workers) as engine:
+            engine.embed(texts[: args.batch_size])  # warm up the pool
+
+            start = time.perf_counter()
+            engine.embed(texts)
+            rate = len(texts) / (time.perf_counter() - start)
+
+        print(f"{f'engine, {workers} worker(s)':<24} {rate:>10.1f} chunks/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
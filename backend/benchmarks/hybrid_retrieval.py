@@ -0,0 +1,100 @@
+# Dense-only vs hybrid (BM25 + RRF) retrieval on the labelled eval set: recall@k,
+# MRR and search latency. Run from the repo root after a rebuild:
+#   python -m backend.benchmarks.hybrid_retrieval [--k 5]
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from backend.rag.bm25_index import tokenize
+from backend.rag.retriever import secure_search_with_scores
+from backend.rag.vector_store import get_embeddings, get_vector_store
+
+EVAL_SET = Path(__file__).with_name("eval_queries.jsonl")
+
+
+def load_eval_set(path: Path = EVAL_SET) -> List[Dict]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# A chunk is relevant when it comes from a labelled source and, if the case lists
+# terms, mentions at least one of them. Both sides are compared as token streams
+# so case, punctuation and line breaks do not matter.
+def is_relevant(doc, case: Dict) -> bool:
+    if doc.metadata.get("source_path") not in case["sources"]:
+        return False
+    text = " ".join(tokenize(doc.page_content))
+    return not case["terms"] or any(" ".join(tokenize(term)) in text for term in case["terms"])
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_case(cases: List[Dict], embeddings: List[List[float]], k: int, hybrid: bool) -> Dict:
+    vector_store = get_vector_store()
+    latencies, hits, reciprocal_ranks = [], [], []
+
+    for case, embedding in zip(cases, embeddings):
+        start = time.perf_counter()
+        results = secure_search_with_scores(
+            vector_store,
+            case["query"],
+            case["role"],
+            k,
+            embedding=embedding,
+            hybrid=hybrid,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        ranks = [i for i, (doc, _) in enumerate(results) if is_relevant(doc, case)]
+        hits.append(1.0 if ranks else 0.0)
+        reciprocal_ranks.append(1.0 / (ranks[0] + 1) if ranks else 0.0)
+
+    return {
+        "recall": statistics.mean(hits),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "misses": [case["query"] for case, hit in zip(cases, hits) if not hit],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = load_eval_set()
+    # Queries are embedded once up front so only the search itself is timed.
+    embeddings = [get_embeddings().embed_query(case["query"]) for case in cases]
+
+    # Warm up both paths (loads the BM25 index from disk).
+    for hybrid in (False, True):
+        run_case(cases[:1], embeddings[:1], args.k, hybrid)
+
+    print(f"{len(cases)} labelled queries, k={args.k}\n")
+    print(f"{'mode':<8} {'recall@k':>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+
+    reports = {}
+    for name, hybrid in (("dense", False), ("hybrid", True)):
+        report = reports[name] = run_case(cases, embeddings, args.k, hybrid)
+        print(
+            f"{name:<8} {report['recall']:>9.2f} {report['mrr']:>6.2f} "
+            f"{report['p50']:>8.2f} {report['p95']:>8.2f}"
+        )
+
+    added = reports["hybrid"]["p50"] - reports["dense"]["p50"]
+    print(f"\nadded latency (p50): {added:+.2f} ms")
+
+    for name, report in reports.items():
+        for query in report["misses"]:
+            print(f"  {name} miss: {query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Concurrent /query load test against the fake LLM backend.
+# Run from the repo root:
+#   LLM_BACKEND=fake python -m backend.benchmarks.load_test [--stub-retrieval] [--users 10 100 500]
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+# Measure the full request path, not answer-cache hits.
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+
+import httpx
+import uvicorn
+
+from backend.auth.dependencies import get_current_user
+from backend.main import app
+from backend.models.user import User
+from backend.rag.rag_pipeline import RAGPipeline
+
+PORT = 8766
+QUERIES = [
+    "What is the leave policy for employees?",
+    "Summarise the quarterly revenue growth.",
+    "Which marketing campaigns ran in Q3 2024?",
+    "Describe the system architecture and tech stack.",
+]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_level(users: int, requests_per_user: int):
+    latencies, rejected, failed = [], 0, 0
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=120
+    ) as client:
+
+        async def user_loop(i: int):
+            nonlocal rejected, failed
+            for j in range(requests_per_user):
+                query = QUERIES[(i + j) % len(QUERIES)]
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/query", json={"query": query})
+                except httpx.TransportError:
+                    failed += 1
+                    continue
+                if response.status_code == 503:
+                    rejected += 1
+                    continue
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user_loop(i) for i in range(users)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, rejected, failed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests-per-user", type=int, default=5)
+    parser.add_argument(
+        "--stub-retrieval",
+        action="store_true",
+        help="replace vector search with a fixed 5 ms CPU-bound stub",
+    )
+    args = parser.parse_args()
+
+    if args.stub_retrieval:
+        def fake_retrieve(self, user_role, query, k):
+            end = time.perf_counter() + 0.005
+            while time.perf_counter() < end:
+                pass
+            return {"cached": None, "results": [], "embedding": [1.0], "index_version": "stub"}
+
+        RAGPipeline._retrieve = fake_retrieve
+
+    app.dependency_overrides[get_current_user] = lambda: User(
+        username="bench", role="c_level", hashed_password=""
+    )
+
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    print(f"{'users':>6} {'ok':>6} {'503':>5} {'err':>5} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for users in args.users:
+        latencies, rejected, failed, elapsed = asyncio.run(
+            run_level(users, args.requests_per_user)
+        )
+        if not latencies:
+            print(f"{users:>6} {0:>6} {rejected:>5} {failed:>5}")
+            continue
+        print(
+            f"{users:>6} {len(latencies):>6} {rejected:>5} {failed:>5} "
+            f"{statistics.median(latencies) * 1000:>9.1f} "
+            f"{percentile(latencies, 0.99) * 1000:>9.1f} "
+            f"{len(latencies) / elapsed:>8.1f}"
+        )
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
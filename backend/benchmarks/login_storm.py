@@ -0,0 +1,100 @@
+# Login throughput and /query latency while a burst of logins hits the server.
+# Run from the repo root:
+#   LLM_BACKEND=fake python -m backend.benchmarks.login_storm [--logins 50] [--seconds 10]
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+
+import httpx
+import uvicorn
+
+from backend.auth.auth_utils import create_access_token
+from backend.db.database import Base, engine
+from backend.db.user_repository import create_user, delete_user
+from backend.main import app
+from backend.rag.rag_pipeline import RAGPipeline
+
+PORT = 8767
+USERNAME = "login_storm_user"
+PASSWORD = "login-storm-password"
+
+
+def stub_retrieve(self, user_role, query, k):
+    return {"cached": None, "results": [], "embedding": [1.0], "index_version": "stub"}
+
+
+async def storm(concurrent_logins: int, seconds: float):
+    logins, query_latencies = 0, []
+    deadline = time.perf_counter() + seconds
+    token = create_access_token({"sub": USERNAME, "role": "employees"})
+    limits = httpx.Limits(max_connections=concurrent_logins + 4)
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60
+    ) as client:
+
+        async def login_loop():
+            nonlocal logins
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/login", data={"username": USERNAME, "password": PASSWORD}
+                )
+                if response.status_code == 200:
+                    logins += 1
+
+        async def query_loop():
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/query", json={"query": "leave policy"}, headers=headers)
+                response.raise_for_status()
+                query_latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(
+            query_loop(),
+            *(login_loop() for _ in range(concurrent_logins)),
+        )
+
+    return logins, query_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, nargs="+", default=[0, 10, 50, 200])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # Keep retrieval out of the picture: this measures thread and CPU contention.
+    RAGPipeline._retrieve = stub_retrieve
+
+    Base.metadata.create_all(bind=engine)
+    create_user(USERNAME, "employees", PASSWORD)
+
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        print(f"{'logins':>7} {'login/s':>8} {'query p50 ms':>13} {'query p99 ms':>13}")
+        for concurrent_logins in args.logins:
+            logins, latencies = asyncio.run(storm(concurrent_logins, args.seconds))
+            latencies.sort()
+            print(
+                f"{concurrent_logins:>7} {logins / args.seconds:>8.1f} "
+                f"{statistics.median(latencies) * 1000:>13.1f} "
+                f"{latencies[int(len(latencies) * 0.99)] * 1000:>13.1f}"
+            )
+    finally:
+        server.should_exit = True
+        delete_user(USERNAME)
+
+
+if __name__ == "__main__":
+    main()
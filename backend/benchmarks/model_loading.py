@@ -0,0 +1,63 @@
+# Startup time and peak RSS of a chunk + embed cycle: the old double model load
+# versus the shared model registry. Each variant runs in a fresh interpreter.
+# Run from the repo root:  python -m backend.benchmarks.model_loading
+import json
+import subprocess
+import sys
+
+LEGACY = """
+import resource, time, json
+start = time.perf_counter()
+from sentence_transformers import SentenceTransformer
+from langchain_huggingface import HuggingFaceEmbeddings
+tokenizer = SentenceTransformer("all-MiniLM-L6-v2").tokenizer
+tokenizer("warm up", add_special_tokens=False)
+HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2").embed_query("warm up")
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+SHARED = """
+import resource, time, json
+start = time.perf_counter()
+from backend.rag.model_registry import get_tokenizer
+from backend.rag.vector_store import get_embeddings
+get_tokenizer()("warm up", add_special_tokens=False)
+get_embeddings().embed_query("warm up")
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+TOKENIZER_ONLY = """
+import resource, time, json
+start = time.perf_counter()
+from backend.rag.model_registry import get_tokenizer
+get_tokenizer()("warm up", add_special_tokens=False)
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def measure(code: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'variant':<28} {'startup s':>10} {'peak RSS MB':>12}")
+    for name, code in [
+        ("two model loads (before)", LEGACY),
+        ("shared registry (after)", SHARED),
+        ("tokenizer only (chunking)", TOKENIZER_ONLY),
+    ]:
+        result = measure(code)
+        print(f"{name:<28} {result['seconds']:>10.2f} {result['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Serial list-building preprocessing vs the streaming process-pool pipeline on a
+# synthetic corpus: files/s, chunks/s and peak memory of the consuming process.
+# Run from the repo root:
+#   python -m backend.benchmarks.preprocessing_throughput [--files 10000]
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.rag.pipeline import BASE_DATA_PATH
+from backend.rag.preprocessing import (
+    PREPROCESS_WORKERS,
+    chunk_file,
+    iter_file_chunks,
+    iter_source_files,
+)
+from backend.rag.model_registry import get_tokenizer
+
+
+# Writes `count` markdown files of 1-8 KB, made of paragraphs sampled from the
+# real corpus, spread over the department folders.
+def build_corpus(root: Path, count: int, seed: int = 7) -> None:
+    paragraphs = [
+        paragraph.strip()
+        for file in BASE_DATA_PATH.rglob("*.md")
+        for paragraph in file.read_text(encoding="utf-8").split("\n\n")
+        if paragraph.strip()
+    ]
+    departments = [d.name for d in BASE_DATA_PATH.iterdir() if d.is_dir()]
+    rng = random.Random(seed)
+
+    for i in range(count):
+        folder = root / departments[i % len(departments)]
+        folder.mkdir(parents=True, exist_ok=True)
+
+        size, parts = rng.randint(1024, 8192), []
+        while sum(len(p) for p in parts) < size:
+            parts.append(rng.choice(paragraphs))
+        (folder / f"doc_{i:05d}.md").write_text("\n\n".join(parts), encoding="utf-8")
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# One measurement in this process; prints a JSON line for the parent.
+def run_mode(corpus: Path, mode: str, workers: int) -> None:
+    directories = [d for d in corpus.iterdir() if d.is_dir()]
+    tokenizer = get_tokenizer()
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    files = chunks = 0
+
+    if mode == "serial":
+        documents = []
+        for file, department, source in iter_source_files(directories):
+            documents.extend(chunk_file(file, department, source, tokenizer))
+            files += 1
+        chunks = len(documents)
+    else:
+        for _, _, documents in iter_file_chunks(iter_source_files(directories), workers=workers):
+            chunks += sum(1 for _ in documents)
+            files += 1
+
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "files": files,
+        "chunks": chunks,
+        "seconds": elapsed,
+        "peak_mb": peak_rss_mb() - baseline,
+    }))
+
+
+def measure(corpus: Path, mode: str, workers: int) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "backend.benchmarks.preprocessing_throughput",
+            "--run", mode, "--corpus", str(corpus), "--workers", str(workers),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=PREPROCESS_WORKERS)
+    parser.add_argument("--corpus", help="reuse an existing synthetic corpus")
+    parser.add_argument("--run", choices=["serial", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_mode(Path(args.corpus), args.run, args.workers)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(args.corpus) if args.corpus else Path(tmp)
+        if not args.corpus:
+            print(f"Writing {args.files} synthetic files...")
+            build_corpus(corpus, args.files)
+
+        cases = [("serial", 1)] + [
+            ("streaming", workers)
+            for workers in sorted({1, max(1, args.workers // 2), args.workers})
+        ]
+
+        print(f"\n{'mode':<22} {'files/s':>9} {'chunks/s':>10} {'peak MB':>9}")
+        for mode, workers in cases:
+            report = measure(corpus, mode, workers)
+            label = mode if mode == "serial" else f"{mode} x{workers}"
+            print(
+                f"{label:<22} {report['files'] / report['seconds']:>9.0f} "
+                f"{report['chunks'] / report['seconds']:>10.0f} {report['peak_mb']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# Offline evaluation of the full RAGPipeline against the deterministic fake LLM.
+# Replays every labelled query in eval_queries.jsonl as every role and reports
+# stage latency percentiles, throughput, recall@k and MRR (for roles allowed to
+# read the labelled sources), prompt tokens, and RBAC leaks (any retrieved chunk
+# or citation from a department the role may not read; exits non-zero on a leak).
+# --sweep-chunks rebuilds the index per chunk size in a subprocess and replays
+# every --k against it. Run from the repo root:
+#   python -m backend.benchmarks.rag_eval [--k 5 15] [--sweep-chunks 128 256 384]
+import os
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_FIRST_TOKEN_DELAY", "0")
+os.environ.setdefault("FAKE_LLM_TOKEN_DELAY", "0")
+# Every replay takes the full path: no answer or query-embedding cache hits.
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+os.environ.setdefault("QUERY_EMBEDDING_CACHE_SIZE", "0")
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from backend.benchmarks.hybrid_retrieval import is_relevant, load_eval_set, percentile
+from backend.llm.prompt_templates import build_prompt
+from backend.monitoring.metrics import start_request_timings
+from backend.rag.model_registry import get_tokenizer
+from backend.rag.preprocessing import iter_source_files
+from backend.rag.rag_pipeline import RAGPipeline
+from backend.rag.rbac import BASE_DATA_PATH, ROLE_DOCUMENT_MAP
+
+
+# Keeps what the pipeline retrieved and packed for the last request.
+class RecordingPipeline(RAGPipeline):
+    def _retrieve(self, user_role: str, query: str, k: int) -> Dict:
+        self.last_documents = []
+        self.last_retrieval = super()._retrieve(user_role, query, k)
+        return self.last_retrieval
+
+    def _context(self, retrieval: Dict):
+        documents, confidence = super()._context(retrieval)
+        self.last_documents = documents
+        return documents, confidence
+
+
+def source_departments() -> Dict[str, str]:
+    directories = [d for d in BASE_DATA_PATH.iterdir() if d.is_dir()]
+    return {file.name: department for file, department, _ in iter_source_files(directories)}
+
+
+# Replays every case as every role; one record per request.
+def replay(pipeline: RecordingPipeline, cases: List[Dict], k: int) -> List[Dict]:
+    departments = source_departments()
+    tokenizer = get_tokenizer()
+    records = []
+
+    for case in cases:
+        labelled = {departments.get(source) for source in case["sources"]}
+
+        for role, allowed in ROLE_DOCUMENT_MAP.items():
+            timings = start_request_timings()
+            start = time.perf_counter()
+            result = pipeline.run(role, case["query"], k)
+            elapsed = time.perf_counter() - start
+
+            results = pipeline.last_retrieval.get("results") or []
+            documents = pipeline.last_documents
+            seen = (
+                [doc.metadata for doc, _ in results]
+                + [doc.metadata for doc in documents]
+                + result["citations"]
+            )
+
+            record = {
+                "role": role,
+                "seconds": elapsed,
+                "stages": dict(timings),
+                "prompt_tokens": len(
+                    tokenizer(build_prompt(case["query"], documents), add_special_tokens=False)["input_ids"]
+                ) if documents else 0,
+                "leaks": sorted({
+                    str(metadata.get("source_path"))
+                    for metadata in seen
+                    if metadata.get("department") not in allowed
+                }),
+            }
+
+            # Recall is only defined for roles that may read every labelled source.
+            if labelled <= set(allowed):
+                ranks = [i for i, (doc, _) in enumerate(results) if is_relevant(doc, case)]
+                record["hit"] = 1.0 if ranks else 0.0
+                record["reciprocal_rank"] = 1.0 / (ranks[0] + 1) if ranks else 0.0
+
+            records.append(record)
+
+    return records
+
+
+def summarize(records: List[Dict]) -> Dict:
+    labelled = [r for r in records if "hit" in r]
+    latencies = [r["seconds"] * 1000 for r in records]
+    prompts = [r["prompt_tokens"] for r in records if r["prompt_tokens"]]
+
+    return {
+        "requests": len(records),
+        "throughput": len(records) / sum(r["seconds"] for r in records),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "labelled": len(labelled),
+        "recall": statistics.mean(r["hit"] for r in labelled) if labelled else 0.0,
+        "mrr": statistics.mean(r["reciprocal_rank"] for r in labelled) if labelled else 0.0,
+        "prompt_tokens": statistics.mean(prompts) if prompts else 0.0,
+        "max_prompt_tokens": max(prompts, default=0),
+        "leaks": sum(len(r["leaks"]) for r in records),
+    }
+
+
+def print_report(records: List[Dict], k: int) -> None:
+    overall = summarize(records)
+    print(
+        f"\nk={k}: {overall['requests']} requests, {overall['throughput']:.1f} req/s, "
+        f"end-to-end p50 {overall['p50_ms']:.1f} / p95 {overall['p95_ms']:.1f} / "
+        f"p99 {overall['p99_ms']:.1f} ms"
+    )
+
+    stages: Dict[str, List[float]] = {}
+    for record in records:
+        for name, seconds in record["stages"].items():
+            stages.setdefault(name, []).append(seconds * 1000)
+
+    print(f"\n{'stage':<16} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, values in stages.items():
+        print(
+            f"{name:<16} {len(values):>6} {percentile(values, 50):>8.2f} "
+            f"{percentile(values, 95):>8.2f} {percentile(values, 99):>8.2f}"
+        )
+
+    print(
+        f"\n{'role':<12} {'labelled':>8} {'recall@k':>9} {'MRR':>6} "
+        f"{'prompt tok':>11} {'max tok':>8} {'leaks':>6}"
+    )
+    for role in ROLE_DOCUMENT_MAP:
+        report = summarize([r for r in records if r["role"] == role])
+        print(
+            f"{role:<12} {report['labelled']:>8} {report['recall']:>9.2f} {report['mrr']:>6.2f} "
+            f"{report['prompt_tokens']:>11.0f} {report['max_prompt_tokens']:>8} {report['leaks']:>6}"
+        )
+    print(
+        f"{'all':<12} {overall['labelled']:>8} {overall['recall']:>9.2f} {overall['mrr']:>6.2f} "
+        f"{overall['prompt_tokens']:>11.0f} {overall['max_prompt_tokens']:>8} {overall['leaks']:>6}"
+    )
+
+    for record in records:
+        for source in record["leaks"]:
+            print(f"  ❌ leak: {record['role']} received {source}")
+
+
+# Sweep point, in a fresh process so CHUNK_MAX_TOKENS and DATA_DIR take effect:
+# builds the index if needed, then prints one summary per k as a JSON line.
+def run_sweep_point(ks: List[int]) -> None:
+    from backend.rag.pipeline import run_pipeline_once
+
+    run_pipeline_once()
+    pipeline = RecordingPipeline()
+    cases = load_eval_set()
+    pipeline.run("employees", "warm up", ks[0])
+
+    print(json.dumps([
+        {"k": k, **summarize(replay(pipeline, cases, k))} for k in ks
+    ]))
+
+
+def sweep(chunk_sizes: List[int], ks: List[int], overlap_ratio: float, keep: bool) -> int:
+    leaks = 0
+    root = Path(tempfile.mkdtemp(prefix="rag_eval_"))
+
+    print(
+        f"\n{'chunk':>6} {'overlap':>8} {'k':>4} {'recall@k':>9} {'MRR':>6} "
+        f"{'prompt tok':>11} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>7} {'leaks':>6}"
+    )
+    for size in chunk_sizes:
+        overlap = int(size * overlap_ratio)
+        env = dict(
+            os.environ,
+            CHUNK_MAX_TOKENS=str(size),
+            CHUNK_OVERLAP=str(overlap),
+            DATA_DIR=str(root / f"chunks_{size}"),
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "backend.benchmarks.rag_eval", "--run", "--k", *map(str, ks)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        for report in json.loads(output.strip().splitlines()[-1]):
+            leaks += report["leaks"]
+            print(
+                f"{size:>6} {overlap:>8} {report['k']:>4} {report['recall']:>9.2f} "
+                f"{report['mrr']:>6.2f} {report['prompt_tokens']:>11.0f} "
+                f"{report['p50_ms']:>8.1f} {report['p95_ms']:>8.1f} "
+                f"{report['throughput']:>7.1f} {report['leaks']:>6}"
+            )
+
+    if keep:
+        print(f"\nIndexes kept in {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return leaks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, nargs="+", default=[15])
+    parser.add_argument("--sweep-chunks", type=int, nargs="+", help="chunk sizes in tokens")
+    parser.add_argument("--overlap-ratio", type=float, default=0.2)
+    parser.add_argument("--keep", action="store_true", help="keep the sweep indexes")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not 0 <= args.overlap_ratio < 1:
+        parser.error("--overlap-ratio must be in [0, 1)")
+    if args.sweep_chunks and min(args.sweep_chunks) <= 0:
+        parser.error("--sweep-chunks sizes must be positive")
+
+    if args.run:
+        run_sweep_point(args.k)
+        return
+
+    if args.sweep_chunks:
+        sys.exit(1 if sweep(args.sweep_chunks, args.k, args.overlap_ratio, args.keep) else 0)
+
+    pipeline = RecordingPipeline()
+    cases = load_eval_set()
+    # Loads models and indexes outside the measurements.
+    pipeline.run("employees", "warm up", args.k[0])
+
+    print(f"{len(cases)} labelled queries x {len(ROLE_DOCUMENT_MAP)} roles")
+    leaks = 0
+    for k in args.k:
+        records = replay(pipeline, cases, k)
+        print_report(records, k)
+        leaks += summarize(records)["leaks"]
+
+    sys.exit(1 if leaks else 0)
+
+
+if __name__ == "__main__":
+    main()
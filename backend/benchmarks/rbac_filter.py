@@ -0,0 +1,87 @@
+# Compares the legacy over-fetch + post-filter search with the `where`-filtered search.
+# Run from the repo root after a rebuild:  python -m backend.benchmarks.rbac_filter
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from backend.rag.rbac import ROLE_DOCUMENT_MAP
+from backend.rag.retriever import role_allowed, secure_search_with_scores
+from backend.rag.vector_store import get_embeddings, get_vector_store
+
+K = 5
+QUERIES = [
+    "What is the leave policy for employees?",
+    "Summarise the quarterly revenue growth.",
+    "Which marketing campaigns ran in Q3 2024?",
+    "What is the average performance rating?",
+    "Describe the system architecture and tech stack.",
+    "What are the working hours and remote work rules?",
+    "How much did the company spend on vendor services?",
+    "What is the customer acquisition cost?",
+]
+
+
+def legacy_search(vector_store, query: str, role: str, k: int):
+    results = vector_store.similarity_search_with_score(query, k=k * 5)
+    return [(d, s) for d, s in results if role_allowed(d, role)][:k]
+
+
+# Exact top-k over every chunk the role may see, used as ground truth for recall@k.
+def exact_top_k(corpus: Dict, query: str, role: str, k: int) -> List[str]:
+    mask = np.array([role_allowed_meta(m, role) for m in corpus["metadatas"]])
+    if not mask.any():
+        return []
+
+    q = np.asarray(get_embeddings().embed_query(query))
+    vectors = corpus["embeddings"][mask]
+    ids = np.asarray(corpus["chunk_ids"])[mask]
+    distances = ((vectors - q) ** 2).sum(axis=1)
+
+    return list(ids[np.argsort(distances)[:k]])
+
+
+def role_allowed_meta(metadata: Dict, role: str) -> bool:
+    return role in {r.strip() for r in metadata.get("accessible_roles", "").split(",")}
+
+
+def run_case(search, vector_store, corpus, role: str):
+    latencies, recalls = [], []
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        results = search(vector_store, query, role, K)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        truth = exact_top_k(corpus, query, role, K)
+        found = {d.metadata.get("chunk_id") for d, _ in results}
+        recalls.append(len(found & set(truth)) / len(truth) if truth else 1.0)
+
+    return statistics.mean(latencies), statistics.mean(recalls)
+
+
+def main():
+    vector_store = get_vector_store()
+    raw = vector_store.get(include=["embeddings", "metadatas"])
+    corpus = {
+        "embeddings": np.asarray(raw["embeddings"]),
+        "metadatas": raw["metadatas"],
+        "chunk_ids": [m.get("chunk_id") for m in raw["metadatas"]],
+    }
+
+    # Warm up the embedding model so the first role does not pay for it.
+    get_embeddings().embed_query("warm up")
+
+    print(f"{'role':<12} {'legacy ms':>10} {'legacy R@k':>11} {'where ms':>9} {'where R@k':>10}")
+    for role in ROLE_DOCUMENT_MAP:
+        legacy_ms, legacy_recall = run_case(legacy_search, vector_store, corpus, role)
+        where_ms, where_recall = run_case(secure_search_with_scores, vector_store, corpus, role)
+        print(
+            f"{role:<12} {legacy_ms:>10.1f} {legacy_recall:>11.2f} "
+            f"{where_ms:>9.1f} {where_recall:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Vector order vs cross-encoder reranking on the labelled eval set: recall and MRR
+# of the chunks sent to the LLM, packed context tokens, and rerank latency with a
+# cold and a warm pair-score cache. Run from the repo root after a rebuild:
+#   python -m backend.benchmarks.rerank [--k 15] [--top-n 4] [--candidates 30]
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+from backend.benchmarks.hybrid_retrieval import is_relevant, load_eval_set, percentile
+from backend.rag.context_packer import pack_context
+from backend.rag.reranker import RERANK_BUDGET_MS, RERANK_CANDIDATES, RERANK_TOP_N, Reranker
+from backend.rag.retriever import secure_search_with_scores
+from backend.rag.vector_store import get_embeddings, get_vector_store
+
+
+def score(cases: List[Dict], ranked: List[List]) -> Dict:
+    hits, reciprocal_ranks, tokens = [], [], []
+
+    for case, results in zip(cases, ranked):
+        ranks = [i for i, (doc, _) in enumerate(results) if is_relevant(doc, case)]
+        hits.append(1.0 if ranks else 0.0)
+        reciprocal_ranks.append(1.0 / (ranks[0] + 1) if ranks else 0.0)
+        tokens.append(pack_context(results)[1])
+
+    return {
+        "chunks": statistics.mean(len(results) for results in ranked),
+        "recall": statistics.mean(hits),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "tokens": statistics.mean(tokens),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=15, help="chunks sent without reranking")
+    parser.add_argument("--top-n", type=int, default=RERANK_TOP_N)
+    parser.add_argument("--candidates", type=int, default=RERANK_CANDIDATES)
+    parser.add_argument("--budget-ms", type=float, default=RERANK_BUDGET_MS)
+    args = parser.parse_args()
+
+    cases = load_eval_set()
+    vector_store = get_vector_store()
+    embeddings = [get_embeddings().embed_query(case["query"]) for case in cases]
+
+    candidates = [
+        secure_search_with_scores(
+            vector_store,
+            case["query"],
+            case["role"],
+            max(args.k, args.candidates),
+            embedding=embedding,
+        )
+        for case, embedding in zip(cases, embeddings)
+    ]
+
+    reranker = Reranker()
+    # Loads the model and seeds the per-pair cost estimate outside the timings.
+    reranker.rerank("warm up", candidates[0], args.top_n, budget_ms=float("inf"))
+
+    rows = {
+        f"vector k={args.k}": score(cases, [results[:args.k] for results in candidates]),
+        f"vector k={args.top_n}": score(cases, [results[:args.top_n] for results in candidates]),
+    }
+
+    for cache in ("cold", "warm"):
+        latencies, ranked = [], []
+        before = reranker.stats()["fallbacks"]
+        for case, results in zip(cases, candidates):
+            start = time.perf_counter()
+            ranked.append(reranker.rerank(case["query"], results, args.top_n, args.budget_ms))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        report = rows[f"rerank {cache}"] = score(cases, ranked)
+        report["p50"] = statistics.median(latencies)
+        report["p95"] = percentile(latencies, 95)
+        report["fallbacks"] = reranker.stats()["fallbacks"] - before
+
+    print(
+        f"{len(cases)} labelled queries, {args.candidates} candidates, "
+        f"top {args.top_n}, budget {args.budget_ms:.0f} ms\n"
+    )
+    print(
+        f"{'mode':<14} {'chunks':>7} {'recall':>7} {'MRR':>6} {'tokens':>7} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'fallbacks':>10}"
+    )
+    for name, report in rows.items():
+        timing = (
+            f"{report['p50']:>7.1f} {report['p95']:>7.1f} {report['fallbacks']:>10}"
+            if "p50" in report else ""
+        )
+        print(
+            f"{name:<14} {report['chunks']:>7.1f} {report['recall']:>7.2f} "
+            f"{report['mrr']:>6.2f} {report['tokens']:>7.0f} {timing}".rstrip()
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Query embedding + vector search throughput with and without the micro-batcher
+# (retrieval_batcher.py) at several levels of concurrency. Every query text is
+# distinct, so no cache answers it. Run from the repo root after a rebuild:
+#   python -m backend.benchmarks.retrieval_batching [--threads 1 8 32] [--queries 256]
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.benchmarks.hybrid_retrieval import load_eval_set, percentile
+from backend.rag.model_registry import SharedEmbeddings
+from backend.rag.rbac import ROLE_DOCUMENT_MAP
+from backend.rag.retrieval_batcher import BatchedQueryEmbeddings, MicroBatcher, batched_search
+from backend.rag.retriever import role_filter
+from backend.rag.vector_store import get_vector_store
+
+ROLES = list(ROLE_DOCUMENT_MAP)
+
+
+def run_level(threads: int, queries: list, batched: bool, k: int):
+    vector_store = get_vector_store()
+    embeddings = BatchedQueryEmbeddings(SharedEmbeddings()) if batched else SharedEmbeddings()
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        embedding = embeddings.embed_query(queries[i])
+        role_scope = role_filter(ROLES[i % len(ROLES)])
+        if batched:
+            batched_search(vector_store, embedding, k, role_scope)
+        else:
+            vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=k, filter=role_scope
+            )
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(len(queries))))
+    elapsed = time.perf_counter() - start
+
+    batcher: MicroBatcher = getattr(embeddings, "batcher", None)
+    mean_batch = batcher.stats()["mean_batch_size"] if batcher else 1.0
+    return len(queries) / elapsed, latencies, mean_batch
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--k", type=int, default=15)
+    args = parser.parse_args()
+
+    cases = load_eval_set()
+    # Warm up the model and the index outside the timings.
+    SharedEmbeddings().embed_query("warm up")
+    get_vector_store()
+
+    print(
+        f"{'threads':>7} {'mode':<9} {'queries/s':>10} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'batch':>6} {'speedup':>8}"
+    )
+    for threads in args.threads:
+        baseline = None
+        for batched in (False, True):
+            # A fresh suffix per run keeps every text new to the model.
+            queries = [
+                f"{cases[i % len(cases)]['query']} ({threads}/{int(batched)}/{i})"
+                for i in range(args.queries)
+            ]
+            throughput, latencies, mean_batch = run_level(threads, queries, batched, args.k)
+            baseline = baseline or throughput
+            print(
+                f"{threads:>7} {'batched' if batched else 'inline':<9} {throughput:>10.1f} "
+                f"{statistics.median(latencies) * 1000:>8.1f} "
+                f"{percentile(latencies, 99) * 1000:>8.1f} {mean_batch:>6.1f} "
+                f"{throughput / baseline:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Dense search per role against one filtered collection versus one partition per
+# department (VECTOR_PARTITIONS, partitioned_store.py). Builds both layouts from
+# the source data in a subprocess each and reports, per role, the chunks the search
+# spans, latency percentiles, and how many of the single-collection top-k hits the
+# partitioned search also returns. Run from the repo root (set VECTOR_BACKEND to
+# compare the FAISS layouts):
+#   python -m backend.benchmarks.role_partitions [--k 15] [--repeat 5]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from backend.benchmarks.hybrid_retrieval import load_eval_set, percentile
+from backend.rag.rbac import ROLE_DOCUMENT_MAP
+
+LAYOUTS = {"single": "false", "partitioned": "true"}
+
+
+def chunk_count(store) -> int:
+    if hasattr(store, "stats"):
+        return store.stats()["live"]
+    return store._collection.count()
+
+
+# Child process: builds the index for the layout in DATA_DIR, then times every
+# labelled query as every role and prints one JSON report.
+def run_layout(k: int, repeat: int) -> None:
+    from backend.rag.model_registry import SharedEmbeddings
+    from backend.rag.pipeline import run_pipeline_once
+    from backend.rag.retriever import dense_search_with_scores
+    from backend.rag.vector_store import VECTOR_PARTITIONS, get_vector_store
+
+    run_pipeline_once()
+    vector_store = get_vector_store()
+    queries = [case["query"] for case in load_eval_set()]
+    embeddings = SharedEmbeddings().embed_documents(queries)
+
+    report = {}
+    for role, departments in ROLE_DOCUMENT_MAP.items():
+        if VECTOR_PARTITIONS:
+            searched = sum(chunk_count(vector_store.partition(d)) for d in departments)
+        else:
+            searched = chunk_count(vector_store)
+
+        latencies, hits = [], []
+        for query, embedding in zip(queries, embeddings):
+            # First pass warms the partition thread pool and the index pages.
+            dense_search_with_scores(vector_store, query, role, k, embedding)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = dense_search_with_scores(vector_store, query, role, k, embedding)
+                latencies.append(time.perf_counter() - start)
+            hits.append([doc.metadata["chunk_id"] for doc, _ in results])
+
+        report[role] = {"searched": searched, "latencies": latencies, "hits": hits}
+
+    print(json.dumps(report))
+
+
+def measure(root: Path, layout: str, k: int, repeat: int) -> Dict:
+    env = dict(
+        os.environ,
+        DATA_DIR=str(root / layout),
+        VECTOR_PARTITIONS=LAYOUTS[layout],
+        # Time the search itself, not the hand-off to the micro-batcher thread.
+        RETRIEVAL_BATCHING="false",
+        QUERY_EMBEDDING_CACHE_SIZE="0",
+    )
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "backend.benchmarks.role_partitions",
+            "--run", "--k", str(k), "--repeat", str(repeat),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5, help="timed searches per query and role")
+    parser.add_argument("--keep", action="store_true", help="keep both indexes")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_layout(args.k, args.repeat)
+        return
+
+    root = Path(tempfile.mkdtemp(prefix="role_partitions_"))
+    try:
+        reports = {layout: measure(root, layout, args.k, args.repeat) for layout in LAYOUTS}
+    finally:
+        if args.keep:
+            print(f"Indexes kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(
+        f"{'role':<12} {'layout':<12} {'chunks':>7} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'speedup':>8} {'overlap@k':>10}"
+    )
+    for role in ROLE_DOCUMENT_MAP:
+        single = reports["single"][role]
+        baseline = statistics.median(single["latencies"])
+        for layout in LAYOUTS:
+            report = reports[layout][role]
+            overlap = [
+                len(set(a) & set(b)) / len(b) if b else 1.0
+                for a, b in zip(report["hits"], single["hits"])
+            ]
+            p50 = statistics.median(report["latencies"])
+            print(
+                f"{role:<12} {layout:<12} {report['searched']:>7} {p50 * 1000:>8.2f} "
+                f"{percentile(report['latencies'], 99) * 1000:>8.2f} "
+                f"{baseline / p50:>7.2f}x {statistics.mean(overlap):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
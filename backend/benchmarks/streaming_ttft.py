@@ -0,0 +1,63 @@
+# Time-to-first-token of /query versus /query/stream against the fake LLM backend.
+# Run from the repo root:  LLM_BACKEND=fake python -m backend.benchmarks.streaming_ttft
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+
+import httpx
+import uvicorn
+
+from backend.auth.dependencies import get_current_user
+from backend.main import app
+from backend.models.user import User
+
+PORT = 8765
+
+QUERIES = [
+    "What is the leave policy for employees?",
+    "Summarise the quarterly revenue growth.",
+    "Which marketing campaigns ran in Q3 2024?",
+]
+
+
+def main():
+    app.dependency_overrides[get_current_user] = lambda: User(
+        username="bench", role="c_level", hashed_password=""
+    )
+    # A real server is needed: the in-process TestClient buffers streamed bodies.
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    client = httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=60)
+
+    blocking, first_token, full_stream = [], [], []
+
+    for query in QUERIES * 3:
+        start = time.perf_counter()
+        client.post("/query", json={"query": query}).raise_for_status()
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with client.stream("POST", "/query/stream", json={"query": query}) as response:
+            seen_token = False
+            for line in response.iter_lines():
+                if not seen_token and '"token"' in line:
+                    first_token.append(time.perf_counter() - start)
+                    seen_token = True
+        full_stream.append(time.perf_counter() - start)
+
+    print(f"/query         full answer   p50 {statistics.median(blocking) * 1000:8.1f} ms")
+    print(f"/query/stream  first token   p50 {statistics.median(first_token) * 1000:8.1f} ms")
+    print(f"/query/stream  full answer   p50 {statistics.median(full_stream) * 1000:8.1f} ms")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Memory of a multi-worker gunicorn deployment (backend/gunicorn.conf.py), with
+# and without preloading in the master. Starts the server per worker count, sends
+# queries through every worker, then reads /proc/<pid>/smaps_rollup (Linux):
+#   RSS      resident pages, shared ones counted in full by every process
+#   private  pages only this process has (what each extra worker really costs)
+#   PSS      shared pages split between the processes using them; the sum over
+#            master + workers is the deployment's actual footprint
+# Run from the repo root after a rebuild (VECTOR_BACKEND=faiss for a shared index):
+#   python -m backend.benchmarks.worker_memory [--workers 1 2 4 8]
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JWT_SECRET_KEY", "worker-memory-benchmark")
+
+import httpx
+
+from backend.benchmarks.hybrid_retrieval import load_eval_set
+from backend.db.database import Base, engine
+from backend.db.user_repository import create_user
+
+PORT = 8767
+USERNAME, PASSWORD = "bench_memory", "bench_memory"
+
+
+def smaps(pid: int) -> Dict[str, float]:
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def children(pid: int) -> List[int]:
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(child) for child in path.read_text().split()]
+
+
+def wait_until_ready(server: subprocess.Popen, workers: int, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        if len(children(server.pid)) == workers:
+            try:
+                if httpx.get(f"http://127.0.0.1:{PORT}/", timeout=5).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+        time.sleep(0.5)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def measure(workers: int, preload: bool, requests: int) -> Dict:
+    env = dict(
+        os.environ,
+        WEB_WORKERS=str(workers),
+        WEB_PRELOAD=str(preload).lower(),
+        BIND=f"127.0.0.1:{PORT}",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py", "backend.main:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        wait_until_ready(server, workers)
+
+        # New connections per request, so gunicorn spreads them over the workers.
+        token = httpx.post(
+            f"http://127.0.0.1:{PORT}/login",
+            data={"username": USERNAME, "password": PASSWORD},
+            timeout=60,
+        ).json()["access_token"]
+        cases = load_eval_set()
+        for i in range(requests * workers):
+            httpx.post(
+                f"http://127.0.0.1:{PORT}/query",
+                json={"query": cases[i % len(cases)]["query"]},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=120,
+            ).raise_for_status()
+
+        master = smaps(server.pid)
+        worker_stats = [smaps(pid) for pid in children(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        "master_rss": master["rss"],
+        "worker_rss": sum(w["rss"] for w in worker_stats) / len(worker_stats),
+        "worker_private": sum(w["private"] for w in worker_stats) / len(worker_stats),
+        "total_pss": master["pss"] + sum(w["pss"] for w in worker_stats),
+        "naive_rss": master["rss"] + sum(w["rss"] for w in worker_stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=10, help="queries per worker")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_user(USERNAME, "c_level", PASSWORD)
+
+    print(
+        f"{'mode':<11} {'workers':>7} {'master RSS':>11} {'worker RSS':>11} "
+        f"{'private/wkr':>12} {'total PSS':>10} {'sum of RSS':>11}"
+    )
+    for preload in (False, True):
+        for workers in args.workers:
+            report = measure(workers, preload, args.requests)
+            print(
+                f"{'preload' if preload else 'per-worker':<11} {workers:>7} "
+                f"{report['master_rss']:>11.0f} {report['worker_rss']:>11.0f} "
+                f"{report['worker_private']:>12.0f} {report['total_pss']:>10.0f} "
+                f"{report['naive_rss']:>11.0f}"
+            )
+
+    print("\nMB. Footprint for N workers ≈ total PSS at 1 worker + (N - 1) × private/wkr.")
+
+
+if __name__ == "__main__":
+    main()
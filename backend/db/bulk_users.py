@@ -0,0 +1,99 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from backend.db.database import engine, Base
+from backend.db.user_repository import bulk_create_users, iter_users
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: str) -> str:
+    suffix = Path(filename or "").suffix.lower().lstrip(".")
+    if suffix in {"jsonl", "ndjson"}:
+        return "jsonl"
+    return "csv"
+
+
+# Parses an import file into row dicts with `username`, `role` and `password`.
+# Unparseable JSONL lines become rows carrying `_error` so they are still reported.
+def parse_users(text: str, fmt: str) -> List[Dict]:
+    if fmt == "jsonl":
+        rows = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            rows.append(row if isinstance(row, dict) else {"_error": "invalid JSON object"})
+        return rows
+
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+# Yields the user table as CSV or JSON lines, one line per user, without hashes.
+def export_users(fmt: str) -> Iterator[str]:
+    if fmt == "jsonl":
+        for user in iter_users():
+            yield json.dumps(user) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["username", "role"])
+    writer.writeheader()
+
+    for user in iter_users():
+        writer.writerow(user)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk user import/export")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser("import", help="create users from a CSV or JSONL file")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=FORMATS)
+
+    export_cmd = commands.add_parser("export", help="write all users to stdout or a file")
+    export_cmd.add_argument("--format", choices=FORMATS, default="csv")
+    export_cmd.add_argument("--output")
+
+    args = parser.parse_args()
+    Base.metadata.create_all(bind=engine)
+
+    if args.command == "import":
+        path = Path(args.path)
+        fmt = args.format or detect_format(path.name)
+        result = bulk_create_users(parse_users(path.read_text(encoding="utf-8"), fmt))
+
+        print(f"✅ Created {result['created']} users.")
+        for error in result["errors"]:
+            print(f"❌ Row {error['row']} ({error['username'] or '-'}): {error['error']}")
+
+        if result["errors"]:
+            sys.exit(1)
+        return
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for part in export_users(args.format):
+            out.write(part)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from pathlib import Path
 import os
@@ -11,10 +11,42 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DATA_DIR / "users.db"
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# How long a writer waits on a locked database before SQLite gives up.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={
+        "check_same_thread": False,
+        "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+    },
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
 )
 
+
+# WAL lets chat reads proceed while an admin write is in progress; NORMAL sync is
+# durable across application crashes and avoids an fsync on every commit.
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
+
+
+# Request-scoped session: every dependency and handler in one request shares it.
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,11 +1,34 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
 from backend.db.database import SessionLocal
 from backend.db.models import UserDB
 from backend.models.user import User
-from backend.auth.password_utils import hash_password
+from backend.auth.password_utils import hash_password, hash_passwords
+from backend.auth.user_cache import user_cache
+from backend.rag.rbac import ROLE_DOCUMENT_MAP
+
+# Usernames per IN (...) clause when checking which imported users already exist.
+_EXISTENCE_BATCH = 500
+
+# Uses the caller's (request-scoped) session when given, otherwise a short-lived one.
+@contextmanager
+def _session(db: Optional[Session] = None):
+    if db is not None:
+        yield db
+        return
 
-def get_user_by_username(username: str):
     db = SessionLocal()
     try:
+        yield db
+    finally:
+        db.close()
+
+def get_user_by_username(username: str, db: Optional[Session] = None):
+    with _session(db) as db:
         user = db.query(UserDB).filter(UserDB.username == username).first()
         if not user:
             return None
@@ -15,24 +38,37 @@ def get_user_by_username(username: str):
             role=user.role,
             hashed_password=user.hashed_password,
         )
-    finally:
-        db.close()
 
-def get_all_users():
-    db = SessionLocal()
-    try:
-        users = db.query(UserDB).all()
-        return [
-            {"username": u.username, "role": u.role}
-            for u in users
-        ]
-    finally:
-        db.close()
+def get_users_page(limit: int, offset: int = 0, db: Optional[Session] = None):
+    with _session(db) as db:
+        rows = db.execute(
+            select(UserDB.username, UserDB.role)
+            .order_by(UserDB.username)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [{"username": username, "role": role} for username, role in rows]
 
 
-def create_user(username: str, role: str, password: str):
-    db = SessionLocal()
-    try:
+def count_users(db: Optional[Session] = None) -> int:
+    with _session(db) as db:
+        return db.execute(select(func.count()).select_from(UserDB)).scalar_one()
+
+
+# Streams every user in username order without loading the table into memory.
+def iter_users(batch_size: int = 1000) -> Iterator[Dict]:
+    with _session() as db:
+        rows = db.execute(
+            select(UserDB.username, UserDB.role)
+            .order_by(UserDB.username)
+            .execution_options(yield_per=batch_size)
+        )
+        for username, role in rows:
+            yield {"username": username, "role": role}
+
+
+def create_user(username: str, role: str, password: str, db: Optional[Session] = None):
+    with _session(db) as db:
         existing = db.query(UserDB).filter(UserDB.username == username).first()
         if existing:
             return None
@@ -45,20 +81,111 @@ def create_user(username: str, role: str, password: str):
 
         db.add(user)
         db.commit()
+        user_cache.invalidate(username)
         return {"username": username, "role": role.lower()}
-    finally:
-        db.close()
 
 
-def delete_user(username: str):
-    db = SessionLocal()
-    try:
+# Validates rows, checks existing usernames in batches, hashes the passwords in
+# parallel and inserts every valid row in one transaction. Invalid rows are
+# reported with their 1-based position and do not block the rest of the import.
+def bulk_create_users(rows: List[Dict], db: Optional[Session] = None) -> Dict:
+    errors: List[Dict] = []
+    candidates: List[Dict] = []
+    seen = set()
+
+    for position, row in enumerate(rows, 1):
+        username = str(row.get("username") or "").strip()
+        role = str(row.get("role") or "").strip().lower()
+        password = str(row.get("password") or "")
+
+        if row.get("_error"):
+            error = row["_error"]
+        elif not username:
+            error = "missing username"
+        elif not password:
+            error = "missing password"
+        elif role not in ROLE_DOCUMENT_MAP:
+            error = f"unknown role '{role}'"
+        elif username in seen:
+            error = "duplicate username in import"
+        else:
+            error = None
+
+        if error:
+            errors.append({"row": position, "username": username, "error": error})
+            continue
+
+        seen.add(username)
+        candidates.append(
+            {"row": position, "username": username, "role": role, "password": password}
+        )
+
+    with _session(db) as db:
+        usernames = [c["username"] for c in candidates]
+        existing = set()
+        for i in range(0, len(usernames), _EXISTENCE_BATCH):
+            existing.update(
+                db.execute(
+                    select(UserDB.username).where(
+                        UserDB.username.in_(usernames[i:i + _EXISTENCE_BATCH])
+                    )
+                ).scalars()
+            )
+
+        new_users = []
+        for candidate in candidates:
+            if candidate["username"] in existing:
+                errors.append({
+                    "row": candidate["row"],
+                    "username": candidate["username"],
+                    "error": "user already exists",
+                })
+            else:
+                new_users.append(candidate)
+
+        hashes = hash_passwords([u["password"] for u in new_users])
+
+        if new_users:
+            db.execute(
+                insert(UserDB),
+                [
+                    {
+                        "username": u["username"],
+                        "role": u["role"],
+                        "hashed_password": hashed,
+                    }
+                    for u, hashed in zip(new_users, hashes)
+                ],
+            )
+            db.commit()
+
+        for u in new_users:
+            user_cache.invalidate(u["username"])
+
+    errors.sort(key=lambda e: e["row"])
+
+    return {"created": len(new_users), "errors": errors}
+
+
+def update_password_hash(username: str, hashed_password: str, db: Optional[Session] = None):
+    with _session(db) as db:
+        user = db.query(UserDB).filter(UserDB.username == username).first()
+        if not user:
+            return False
+
+        user.hashed_password = hashed_password
+        db.commit()
+        user_cache.invalidate(username)
+        return True
+
+
+def delete_user(username: str, db: Optional[Session] = None):
+    with _session(db) as db:
         user = db.query(UserDB).filter(UserDB.username == username).first()
         if not user:
             return False
 
         db.delete(user)
         db.commit()
+        user_cache.invalidate(username)
         return True
-    finally:
-        db.close()
@@ -0,0 +1,53 @@
+# Multi-worker deployment. Run from the repo root:
+#   gunicorn -c backend/gunicorn.conf.py backend.main:app
+#
+# With WEB_PRELOAD=true (default) the master imports the app, loads the models and
+# maps the vector index, then forks the workers, which share that memory instead
+# of each loading a copy. Use VECTOR_BACKEND=faiss for a shared index; Chroma is
+# opened separately in every worker. Measure per-worker memory with
+#   python -m backend.benchmarks.worker_memory
+import multiprocessing
+import os
+
+# HF tokenizers disable their own thread pool after a fork anyway; say so up front.
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+bind = os.getenv("BIND", "0.0.0.0:" + os.getenv("PORT", "8000"))
+workers = int(os.getenv("WEB_WORKERS", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+preload_app = os.getenv("WEB_PRELOAD", "true").lower() == "true"
+
+
+# Master, after the app is imported and before any worker is forked.
+def when_ready(server):
+    if not preload_app:
+        return
+
+    from backend.db.database import engine
+    from backend.main import startup_event
+    from backend.rag.preload import preload_shared_state
+
+    # Creates tables and the default admin once, instead of every worker racing
+    # to insert it; pooled connections are then closed so none cross the fork.
+    startup_event()
+    engine.dispose()
+
+    preload_shared_state()
+
+
+def post_fork(server, worker):
+    from backend.rag.preload import after_fork
+
+    after_fork()
+
+
+# Without preloading, each worker loads its own copy before serving.
+def post_worker_init(worker):
+    if preload_app:
+        return
+
+    from backend.rag.preload import after_fork, preload_shared_state
+
+    preload_shared_state()
+    after_fork()
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Iterator
+
+from backend.monitoring.metrics import record_llm_usage
+
+FAKE_LLM_FIRST_TOKEN_DELAY = float(os.getenv("FAKE_LLM_FIRST_TOKEN_DELAY", "0.2"))
+FAKE_LLM_TOKEN_DELAY = float(os.getenv("FAKE_LLM_TOKEN_DELAY", "0.02"))
+
+
+# Deterministic stand-in for Gemini, selected with LLM_BACKEND=fake.
+# Used for local development, streaming tests and load tests without API cost.
+class FakeLLMClient:
+    def __init__(
+        self,
+        first_token_delay: float = FAKE_LLM_FIRST_TOKEN_DELAY,
+        token_delay: float = FAKE_LLM_TOKEN_DELAY,
+    ):
+        self.model = "fake"
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    def _answer(self, prompt: str) -> str:
+        sources = prompt.count("[Source:")
+        answer = (
+            f"- This is a fake answer built from {sources} context chunks.\n"
+            f"- The prompt was {len(prompt)} characters long."
+        )
+        # Whitespace-separated words stand in for tokens.
+        record_llm_usage(len(prompt.split()), len(answer.split()))
+        return answer
+
+    def generate(self, prompt: str) -> str:
+        answer = self._answer(prompt)
+        time.sleep(self.first_token_delay + self.token_delay * len(answer.split(" ")))
+        return answer
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        time.sleep(self.first_token_delay)
+        for word in self._answer(prompt).split(" "):
+            yield word + " "
+            time.sleep(self.token_delay)
+
+    async def agenerate(self, prompt: str) -> str:
+        answer = self._answer(prompt)
+        await asyncio.sleep(self.first_token_delay + self.token_delay * len(answer.split(" ")))
+        return answer
+
+    async def agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_delay)
+        for word in self._answer(prompt).split(" "):
+            yield word + " "
+            await asyncio.sleep(self.token_delay)
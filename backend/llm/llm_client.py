@@ -1,15 +1,30 @@
 import os
+from typing import AsyncIterator, Iterator
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from backend.monitoring.metrics import record_llm_usage
+
 load_dotenv()
 
+# "gemini" (default) or "fake" for the deterministic local backend.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
+if LLM_BACKEND == "gemini" and not GEMINI_API_KEY:
     raise RuntimeError("❌ GEMINI_API_KEY not found in .env file")
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+client = genai.Client(api_key=GEMINI_API_KEY) if LLM_BACKEND == "gemini" else None
+
+def _record_usage(response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        record_llm_usage(usage.prompt_token_count, usage.candidates_token_count)
+
+
+NO_ANSWER_MESSAGE = "The requested information is not available in the provided documents."
+ERROR_MESSAGE = "An error occurred while generating the response."
 
 
 class LLMClient:
@@ -27,12 +42,89 @@ class LLMClient:
                 contents=prompt,
                 config=self.config,
             )
+            _record_usage(response)
 
             if not response or not response.text:
-                return "The requested information is not available in the provided documents."
+                return NO_ANSWER_MESSAGE
 
             return response.text.strip()
             
         except Exception as e:
             print(f"LLM Generation Error: {e}")
-            return "An error occurred while generating the response."
\ No newline at end of file
+            return ERROR_MESSAGE
+
+    # Yields text fragments as Gemini produces them.
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        produced = False
+        last_chunk = None
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=self.config,
+            ):
+                last_chunk = chunk
+                if chunk.text:
+                    produced = True
+                    yield chunk.text
+
+        except Exception as e:
+            print(f"LLM Streaming Error: {e}")
+            yield ERROR_MESSAGE if not produced else f"\n\n{ERROR_MESSAGE}"
+            return
+
+        # Gemini reports cumulative usage on the final streamed chunk.
+        _record_usage(last_chunk)
+
+        if not produced:
+            yield NO_ANSWER_MESSAGE
+
+    async def agenerate(self, prompt: str) -> str:
+        try:
+            response = await client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=self.config,
+            )
+            _record_usage(response)
+
+            if not response or not response.text:
+                return NO_ANSWER_MESSAGE
+
+            return response.text.strip()
+
+        except Exception as e:
+            print(f"LLM Generation Error: {e}")
+            return ERROR_MESSAGE
+
+    async def agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
+        produced = False
+        last_chunk = None
+        try:
+            async for chunk in client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=self.config,
+            ):
+                last_chunk = chunk
+                if chunk.text:
+                    produced = True
+                    yield chunk.text
+
+        except Exception as e:
+            print(f"LLM Streaming Error: {e}")
+            yield ERROR_MESSAGE if not produced else f"\n\n{ERROR_MESSAGE}"
+            return
+
+        # Gemini reports cumulative usage on the final streamed chunk.
+        _record_usage(last_chunk)
+
+        if not produced:
+            yield NO_ANSWER_MESSAGE
+
+
+def get_llm_client():
+    if LLM_BACKEND == "fake":
+        from backend.llm.fake_llm_client import FakeLLMClient
+        return FakeLLMClient()
+    return LLMClient()
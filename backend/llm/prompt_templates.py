@@ -17,14 +17,10 @@ def build_prompt(query: str, documents: List[Document]) -> str:
         "Answer in clear bullet points.\n"
     )
 
-    return f"""
-            {SYSTEM_PROMPT}
-
-            ### Context Data:
-            {context}
-
-            ### User Question:
-            {query}
-
-            ### Answer:
-            """
\ No newline at end of file
+    # No template indentation: every character here is a billed prompt token.
+    return (
+        f"{SYSTEM_PROMPT}\n"
+        f"### Context Data:\n{context}\n\n"
+        f"### User Question:\n{query}\n\n"
+        "### Answer:\n"
+    )
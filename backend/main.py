@@ -1,6 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from pathlib import Path
 import os
+import time
 from dotenv import load_dotenv
 
 from backend.routes import auth_routes, chat_routes
@@ -9,6 +11,16 @@ from backend.routes.user_routes import router as user_router
 from backend.db.database import SessionLocal, engine, Base
 from backend.db.models import UserDB
 from backend.auth.password_utils import hash_password
+from backend.monitoring.metrics import (
+    HTTP_REQUEST_SECONDS,
+    CallbackMetric,
+    render_prometheus,
+    server_timing_header,
+    start_request_timings,
+)
+from backend.rag.rag_pipeline import rag_pipeline
+from backend.rag.reranker import reranker
+from backend.rag.vector_store import get_embeddings
 
 load_dotenv()
 
@@ -64,6 +76,71 @@ def startup_event():
     print("✅ Startup complete.\n")
 
 
+# Records handler latency and exposes this request's stage timings as `Server-Timing`.
+# Streaming responses only include the stages finished before the first byte.
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    timings = start_request_timings()
+    start = time.perf_counter()
+
+    response = await call_next(request)
+
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+
+    return response
+
+
+def _cache_stats():
+    stats = {}
+    for cache, values in (
+        ("answer", rag_pipeline.answer_cache.stats()),
+        ("query_embedding", get_embeddings().stats()),
+        ("rerank_pair", reranker.stats()),
+    ):
+        stats[(cache, "hits")] = values["hits"]
+        stats[(cache, "misses")] = values["misses"]
+    return stats
+
+
+CallbackMetric(
+    "intrabot_cache_lookups_total",
+    "Cache hits and misses since startup.",
+    ("cache", "result"),
+    _cache_stats,
+    kind="counter",
+)
+
+
+def _rerank_stats():
+    stats = reranker.stats()
+    return {"reranked": stats["reranked"], "fallback": stats["fallbacks"]}
+
+
+CallbackMetric(
+    "intrabot_rerank_requests_total",
+    "Reranked requests, and those that fell back to retrieval order on the time budget.",
+    ("result",),
+    _rerank_stats,
+    kind="counter",
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 app.include_router(auth_routes.router)
 app.include_router(chat_routes.router)
 app.include_router(user_router)
@@ -0,0 +1,172 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+CHUNK_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+_REGISTRY: List = []
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Minimal Prometheus-compatible histogram, enough for the text exposition format.
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+
+        return lines
+
+
+# Metric whose samples are read from a callback at scrape time, e.g. cache stats.
+class CallbackMetric:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...],
+        fn: Callable[[], Dict],
+        kind: str = "gauge",
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.kind = kind
+        _REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.fn().items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "intrabot_stage_duration_seconds",
+    "Time spent in each request stage.",
+    labelnames=("stage",),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "intrabot_http_request_duration_seconds",
+    "End-to-end HTTP handler latency.",
+    labelnames=("method", "route", "status"),
+)
+PROMPT_TOKENS = Histogram(
+    "intrabot_llm_prompt_tokens",
+    "Prompt tokens sent to the LLM per request.",
+    buckets=TOKEN_BUCKETS,
+)
+RESPONSE_TOKENS = Histogram(
+    "intrabot_llm_response_tokens",
+    "Response tokens produced by the LLM per request.",
+    buckets=TOKEN_BUCKETS,
+)
+CONTEXT_TOKENS = Histogram(
+    "intrabot_context_tokens",
+    "Tokens of retrieved context packed into each prompt.",
+    buckets=TOKEN_BUCKETS,
+)
+RETRIEVED_CHUNKS = Histogram(
+    "intrabot_retrieved_chunks",
+    "Chunks returned by retrieval per request.",
+    buckets=CHUNK_BUCKETS,
+)
+RETRIEVAL_BATCH_SIZE = Histogram(
+    "intrabot_retrieval_batch_size",
+    "Queries handled per micro-batch by the retrieval batcher.",
+    labelnames=("batcher",),
+    buckets=BATCH_BUCKETS,
+)
+
+# Per-request {stage: seconds}; set by the HTTP middleware, None outside requests.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def record_llm_usage(prompt_tokens: Optional[int], response_tokens: Optional[int]) -> None:
+    if prompt_tokens is not None:
+        PROMPT_TOKENS.observe(prompt_tokens)
+    if response_tokens is not None:
+        RESPONSE_TOKENS.observe(response_tokens)
+
+
+# `Server-Timing` header value, e.g. "auth_jwt;dur=0.4, vector_search;dur=12.1".
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+    )
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.rag.query_embedding_cache import normalize_query
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "600"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+
+
+def _unit(vector: List[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+# Pipeline answers cached per (role, k) scope so RBAC-filtered answers never cross
+# roles. Lookups match the normalized query exactly, or any cached query whose
+# embedding is within the cosine threshold. Entries expire after the TTL, the
+# least recently used entry is evicted when a scope is full, and entries written
+# against another index version are ignored. Entries stored without an embedding
+# (computed table answers) only match exactly.
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._scopes: Dict[tuple, OrderedDict] = {}
+        self._lock = threading.Lock()
+
+    def _live_entries(self, scope: tuple, index_version: str) -> OrderedDict:
+        entries = self._scopes.get(scope)
+        if entries is None:
+            return OrderedDict()
+
+        now = time.monotonic()
+        for key in [
+            key for key, entry in entries.items()
+            if entry["expires_at"] < now or entry["index_version"] != index_version
+        ]:
+            del entries[key]
+
+        return entries
+
+    def get(self, role: str, k: int, query: str, index_version: str) -> Optional[Dict]:
+        with self._lock:
+            entries = self._live_entries((role, k), index_version)
+            key = normalize_query(query)
+
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]["result"]
+
+        return None
+
+    # Counts a miss when nothing is close enough; call after `get` found nothing.
+    def get_similar(
+        self, role: str, k: int, embedding: List[float], index_version: str
+    ) -> Optional[Dict]:
+        with self._lock:
+            entries = self._live_entries((role, k), index_version)
+
+            keys = [key for key, entry in entries.items() if entry["embedding"] is not None]
+
+            if keys and self.threshold < 1.0:
+                matrix = np.stack([entries[key]["embedding"] for key in keys])
+                similarities = matrix @ _unit(embedding)
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.threshold:
+                    entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return entries[keys[best]]["result"]
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        role: str,
+        k: int,
+        query: str,
+        embedding: Optional[List[float]],
+        index_version: str,
+        result: Dict,
+    ) -> None:
+        with self._lock:
+            entries = self._scopes.setdefault((role, k), OrderedDict())
+            key = normalize_query(query)
+
+            entries[key] = {
+                "embedding": None if embedding is None else _unit(embedding),
+                "result": result,
+                "index_version": index_version,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            entries.move_to_end(key)
+
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scopes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": sum(len(entries) for entries in self._scopes.values()),
+            }
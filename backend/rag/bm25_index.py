@@ -0,0 +1,153 @@
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from backend.rag.vector_store import DATA_DIR
+
+BM25_PATH = DATA_DIR / "bm25_index.pkl"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Keeps identifiers whole: "finemp1042", "q3", "2024", "oauth", "3.75x", "e-commerce".
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-_/][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+# Lexical index over the same chunks (and RBAC metadata) as the vector store.
+# Postings are maintained incrementally so the indexer can upsert and delete by
+# chunk_id exactly like it does for Chroma.
+class BM25Index:
+    def __init__(self):
+        self.docs: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def delete(self, chunk_ids: List[str]) -> None:
+        for chunk_id in chunk_ids:
+            doc = self.docs.pop(chunk_id, None)
+            if doc is None:
+                continue
+
+            self.total_length -= doc["length"]
+            for term in doc["terms"]:
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(chunk_id, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def upsert(self, documents: List[Document]) -> None:
+        self.delete([doc.metadata["chunk_id"] for doc in documents])
+
+        for doc in documents:
+            chunk_id = doc.metadata["chunk_id"]
+            counts = Counter(tokenize(doc.page_content))
+            length = sum(counts.values())
+
+            self.docs[chunk_id] = {
+                "text": doc.page_content,
+                "metadata": doc.metadata,
+                "terms": list(counts),
+                "length": length,
+            }
+            self.total_length += length
+
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+
+    # Returns up to k (Document, bm25 score) pairs, best first, restricted to chunks
+    # whose metadata matches every key in `where` (the same filter Chroma gets).
+    def search(
+        self, query: str, k: int, where: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+
+        avg_length = self.total_length / n_docs
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+
+            for chunk_id, tf in posting.items():
+                length = self.docs[chunk_id]["length"]
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+        results: List[Tuple[Document, float]] = []
+        for chunk_id in sorted(scores, key=scores.get, reverse=True):
+            doc = self.docs[chunk_id]
+            if where and any(doc["metadata"].get(key) != value for key, value in where.items()):
+                continue
+
+            results.append(
+                (Document(page_content=doc["text"], metadata=doc["metadata"]), scores[chunk_id])
+            )
+            if len(results) == k:
+                break
+
+        return results
+
+    def save(self, path=BM25_PATH) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=BM25_PATH) -> "BM25Index":
+        with path.open("rb") as f:
+            return pickle.load(f)
+
+
+_lock = threading.Lock()
+_bm25_index: Optional[BM25Index] = None
+_bm25_mtime: Optional[int] = None
+
+
+# Loaded lazily on first hybrid query and reloaded when the file changes, e.g.
+# after the indexer ran in another process; None when no lexical index exists.
+# While one thread reloads, the others keep using the previous index.
+def get_bm25_index() -> Optional[BM25Index]:
+    global _bm25_index, _bm25_mtime
+    try:
+        mtime = BM25_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        _bm25_index = _bm25_mtime = None
+        return None
+
+    if mtime != _bm25_mtime and _lock.acquire(blocking=_bm25_index is None):
+        try:
+            if mtime != _bm25_mtime:
+                print("📦 Loading BM25 index...")
+                _bm25_index = BM25Index.load()
+                _bm25_mtime = mtime
+        finally:
+            _lock.release()
+    return _bm25_index
+
+
+def set_bm25_index(index: BM25Index) -> None:
+    global _bm25_index, _bm25_mtime
+    index.save()
+    with _lock:
+        _bm25_index = index
+        _bm25_mtime = BM25_PATH.stat().st_mtime_ns
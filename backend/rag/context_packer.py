@@ -0,0 +1,124 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from backend.rag.model_registry import get_tokenizer
+
+# Tokens of retrieved text allowed into one prompt.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Word-set Jaccard similarity above which the lower-ranked chunk is dropped.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+_CHUNK_INDEX = re.compile(r"^(.*)::chunk_(\d+)$")
+
+
+# (source, window index) from the chunk id; source_path is only the file name and
+# is shared by same-named files in different folders.
+def _chunk_position(doc: Document) -> Optional[Tuple[str, int]]:
+    match = _CHUNK_INDEX.match(doc.metadata.get("chunk_id", ""))
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+# Joins two consecutive windows of one file. Text windows are slices of the same
+# cleaned text, so their character offsets give the exact overlap; CSV row groups
+# share only the header line.
+def _join(first: Document, second: Document) -> str:
+    if "row_start" in second.metadata:
+        return first.page_content + "\n" + second.page_content.split("\n", 1)[-1]
+
+    overlap = first.metadata.get("char_end", -1) - second.metadata.get("char_start", 0)
+    if 0 <= overlap <= len(second.page_content):
+        return first.page_content + second.page_content[overlap:]
+
+    return first.page_content + " ... " + second.page_content
+
+
+# Merges retrieved chunks that are consecutive windows of the same source into one
+# document. `results` is ranked best first (fused search order); each merged
+# document takes the rank and score of its best member and keeps that order.
+def merge_adjacent(results: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+    by_source: Dict[str, List[Tuple[int, int, Document, float]]] = {}
+    merged: List[Tuple[int, Document, float]] = []
+
+    for rank, (doc, score) in enumerate(results):
+        position = _chunk_position(doc)
+        if position is None:
+            merged.append((rank, doc, score))
+        else:
+            source, index = position
+            by_source.setdefault(source, []).append((index, rank, doc, score))
+
+    for chunks in by_source.values():
+        chunks.sort(key=lambda chunk: chunk[0])
+        run_index, run_rank, first, run_score = chunks[0]
+        run = Document(page_content=first.page_content, metadata=dict(first.metadata))
+
+        for index, rank, doc, score in chunks[1:]:
+            if index == run_index:
+                run_rank, run_score = min(run_rank, rank), min(run_score, score)
+                continue
+
+            if index == run_index + 1:
+                run.page_content = _join(run, doc)
+                # The merged document spans both windows.
+                for key in ("char_end", "row_end"):
+                    if key in doc.metadata:
+                        run.metadata[key] = doc.metadata[key]
+                run_index = index
+                run_rank, run_score = min(run_rank, rank), min(run_score, score)
+                continue
+
+            merged.append((run_rank, run, run_score))
+            run_index, run_rank, run_score = index, rank, score
+            run = Document(page_content=doc.page_content, metadata=dict(doc.metadata))
+
+        merged.append((run_rank, run, run_score))
+
+    return [(doc, score) for _, doc, score in sorted(merged, key=lambda item: item[0])]
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+# Turns retrieval results into the prompt context: merges adjacent windows, drops
+# near-duplicates and keeps the best-ranked documents that fit the token budget.
+# The best document is always kept. Returns the documents and their token count.
+def pack_context(
+    results: List[Tuple[Document, float]],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+) -> Tuple[List[Document], int]:
+    candidates: List[Document] = []
+    seen: List[set] = []
+
+    for doc, _ in merge_adjacent(results):
+        words = _words(doc.page_content)
+        if any(
+            len(words & other) / (len(words | other) or 1) >= NEAR_DUPLICATE_THRESHOLD
+            for other in seen
+        ):
+            continue
+        candidates.append(doc)
+        seen.append(words)
+
+    if not candidates:
+        return [], 0
+
+    lengths = [
+        len(ids)
+        for ids in get_tokenizer()(
+            [doc.page_content for doc in candidates],
+            add_special_tokens=False,
+        )["input_ids"]
+    ]
+
+    documents, used = [], 0
+    for doc, length in zip(candidates, lengths):
+        if documents and used + length > budget:
+            continue
+        documents.append(doc)
+        used += length
+
+    return documents, used
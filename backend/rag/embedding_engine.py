@@ -0,0 +1,78 @@
+import os
+from typing import List
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from backend.rag.model_registry import EMBED_NORMALIZE, get_sentence_transformer
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", str(os.cpu_count() or 1)))
+
+# Number of chunks embedded and written to the store at a time during a build.
+EMBED_STREAM_SIZE = int(os.getenv("EMBED_STREAM_SIZE", "2048"))
+
+
+# Corpus-build embedder: length-sorted batches spread over a pool of CPU worker
+# processes. Use as a context manager so the pool is torn down after the build.
+class EmbeddingEngine:
+    def __init__(
+        self,
+        batch_size: int = EMBED_BATCH_SIZE,
+        workers: int = EMBED_WORKERS,
+        normalize: bool = EMBED_NORMALIZE,
+    ):
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.normalize = normalize
+        self.model = get_sentence_transformer()
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            # Each worker gets its share of cores so the pool does not oversubscribe the CPU.
+            threads = str(max(1, (os.cpu_count() or 1) // self.workers))
+            previous = os.environ.get("OMP_NUM_THREADS")
+            os.environ["OMP_NUM_THREADS"] = threads
+            try:
+                self._pool = self.model.start_multi_process_pool(
+                    ["cpu"] * self.workers
+                )
+            finally:
+                if previous is None:
+                    os.environ.pop("OMP_NUM_THREADS", None)
+                else:
+                    os.environ["OMP_NUM_THREADS"] = previous
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            SentenceTransformer.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()))
+
+        # Sort by length so each batch (and each worker's slice) pads to similar sizes.
+        order = np.argsort([len(t) for t in texts])
+        sorted_texts = [texts[i] for i in order]
+
+        if self._pool is not None:
+            vectors = self.model.encode_multi_process(
+                sorted_texts,
+                self._pool,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize,
+            )
+        else:
+            vectors = self.model.encode(
+                sorted_texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize,
+                convert_to_numpy=True,
+            )
+
+        restored = np.empty_like(vectors)
+        restored[order] = vectors
+        return restored
@@ -0,0 +1,346 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from backend.rag.rbac import ROLE_DOCUMENT_MAP, role_metadata_key
+
+# hnsw_sq8: HNSW graph over int8 scalar-quantized vectors (1 byte per dimension).
+# ivfpq: inverted lists of product-quantized codes (FAISS_PQ_M bytes per vector);
+# smallest footprint, recall bounded by the code size, so raise FAISS_PQ_M for recall.
+# flat: exact search over float32 vectors, for small corpora and ground truth.
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "hnsw_sq8")
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_EF_CONSTRUCTION = int(os.getenv("FAISS_EF_CONSTRUCTION", "200"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "128"))
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "4096"))
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "32"))
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "48"))
+# Serve queries from a memory-mapped index file instead of reading it into RAM.
+FAISS_MMAP = os.getenv("FAISS_MMAP", "true").lower() == "true"
+
+# One bit per role, in ROLE_DOCUMENT_MAP order, stored per vector.
+_ROLE_BITS = {role_metadata_key(role): 1 << i for i, role in enumerate(ROLE_DOCUMENT_MAP)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    roles INTEGER NOT NULL,
+    live INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS chunks_live_chunk_id ON chunks (chunk_id) WHERE live = 1;
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def _role_bits(metadata: Dict) -> int:
+    return sum(bit for key, bit in _ROLE_BITS.items() if metadata.get(key))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    return max(m for m in range(1, min(FAISS_PQ_M, dim) + 1) if dim % m == 0)
+
+
+# Local FAISS vector store with the subset of the LangChain Chroma interface the
+# retriever and indexer use. Vectors live in the FAISS index (position = id);
+# text and metadata live in a SQLite docstore next to it, so neither has to be
+# held in memory. Role visibility is a bitmask per vector, turned into a FAISS
+# IDSelectorBitmap so the `where`-style role filter is applied inside the ANN
+# search. Deletes and re-upserts tombstone the old position; space is reclaimed
+# by the next full rebuild.
+class FaissVectorStore:
+    def __init__(self, directory: Path, embedding_function=None, index_type: str = FAISS_INDEX_TYPE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.faiss"
+        self.db_path = self.directory / "docstore.sqlite3"
+        self.embedding_function = embedding_function
+
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._local = threading.local()
+        self._masks: Dict[int, np.ndarray] = {}
+        self._generation = 0
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+        self.index_type = index_type
+
+        self._load()
+
+    # One connection per thread, reopened after a fork (pre-fork servers load the
+    # store in the master, and SQLite connections must not cross into workers) and
+    # after a reload, since a rebuild replaces the docstore file.
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid() or self._local.generation != self._generation:
+            if conn is not None and self._local.pid == os.getpid():
+                conn.close()
+            conn = self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._local.pid = os.getpid()
+            self._local.generation = self._generation
+        return conn
+
+    # Reads the index and role bits into locals and swaps them in together, so a
+    # concurrent search sees either the old state or the new one, never a mix.
+    def _load(self) -> None:
+        index, mmapped, mtime = None, False, None
+        index_type, rows = self.index_type, []
+
+        if self.index_path.exists():
+            mtime = self.index_path.stat().st_mtime_ns
+            conn = sqlite3.connect(self.db_path)
+            try:
+                # An existing index keeps the type it was built with.
+                row = conn.execute("SELECT value FROM settings WHERE key = 'index_type'").fetchone()
+                index_type = row[0] if row else index_type
+                rows = conn.execute("SELECT id, roles FROM chunks WHERE live = 1").fetchall()
+            finally:
+                conn.close()
+
+            if FAISS_MMAP:
+                # MMAP_IFC maps every index type zero-copy; older FAISS only has
+                # MMAP, which maps IVF inverted lists. The two cannot be combined.
+                if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+                    flags = faiss.IO_FLAG_MMAP_IFC
+                    mmapped = True
+                else:
+                    flags = faiss.IO_FLAG_MMAP
+                    mmapped = index_type == "ivfpq"
+                    if not mmapped:
+                        print(
+                            f"⚠️ faiss {faiss.__version__} cannot memory-map {index_type} "
+                            "indexes (needs faiss-cpu>=1.11); reading it into memory."
+                        )
+                index = faiss.read_index(str(self.index_path), flags | faiss.IO_FLAG_READ_ONLY)
+            else:
+                index = faiss.read_index(str(self.index_path))
+
+        # Rows written after the last save() have no vector yet and stay invisible.
+        total = index.ntotal if index is not None else 0
+        roles = np.zeros(total, dtype=np.uint8)
+        rows = [(i, bits) for i, bits in rows if i < total]
+        if rows:
+            ids, bits = np.asarray(rows, dtype=np.int64).T
+            roles[ids] = bits
+
+        with self._lock:
+            self.index, self.index_type, self.mmapped, self.mtime = index, index_type, mmapped, mtime
+            self.roles = roles
+            self._masks = {}
+            # Every thread reopens its docstore connection on next use.
+            self._generation += 1
+
+    # Picks up an index rebuilt by another process (e.g. the indexer). Searches keep
+    # using the previous index until the new one is swapped in.
+    def refresh(self) -> None:
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self.mtime:
+            with self._reload_lock:
+                if mtime != self.mtime:
+                    print("📦 Reloading FAISS index...")
+                    self._load()
+
+    def _new_index(self, vectors: np.ndarray):
+        count, dim = vectors.shape
+
+        if self.index_type == "flat":
+            return faiss.IndexFlatL2(dim)
+
+        if self.index_type == "ivfpq":
+            # Trained on the first batch written; large builds should use a big
+            # EMBED_STREAM_SIZE so the centroids see a representative sample.
+            nlist = max(1, min(FAISS_IVF_NLIST, count // 39))
+            nbits = 8 if count >= 256 else max(1, int(np.log2(count)))
+            index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, _pq_subquantizers(dim), nbits)
+        elif self.index_type == "hnsw_sq8":
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, FAISS_HNSW_M)
+            index.hnsw.efConstruction = FAISS_EF_CONSTRUCTION
+        else:
+            raise ValueError(f"Unknown FAISS_INDEX_TYPE: {self.index_type}")
+
+        index.train(vectors)
+        return index
+
+    def _tombstone(self, conn: sqlite3.Connection, chunk_ids: List[str]) -> None:
+        for i in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            ids = [
+                row[0] for row in conn.execute(
+                    f"SELECT id FROM chunks WHERE live = 1 AND chunk_id IN ({marks})", batch
+                )
+            ]
+            if ids:
+                conn.execute(
+                    f"UPDATE chunks SET live = 0 WHERE id IN ({','.join('?' * len(ids))})", ids
+                )
+                ids = np.asarray(ids)
+                self.roles[ids[ids < len(self.roles)]] = 0
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]) -> None:
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        with self._lock:
+            if self.mmapped:
+                # Memory-mapped indexes are read-only; load a writable copy.
+                self.index = faiss.read_index(str(self.index_path))
+                self.mmapped = False
+            if self.index is None:
+                self.index = self._new_index(vectors)
+
+            conn = self._connection()
+            self._tombstone(conn, ids)
+
+            start = self.index.ntotal
+            self.index.add(vectors)
+            bits = [_role_bits(metadata) for metadata in metadatas]
+
+            conn.executemany(
+                "INSERT INTO chunks (id, chunk_id, text, metadata, roles) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (start + i, chunk_id, text, json.dumps(metadata), bits[i])
+                    for i, (chunk_id, text, metadata) in enumerate(zip(ids, documents, metadatas))
+                ],
+            )
+            conn.commit()
+
+            self.roles = np.concatenate([self.roles, np.asarray(bits, dtype=np.uint8)])
+            self._masks.clear()
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            conn = self._connection()
+            self._tombstone(conn, ids)
+            conn.commit()
+            self._masks.clear()
+
+    # Writes the index file atomically; the docstore is already committed.
+    def save(self) -> None:
+        with self._lock:
+            if self.index is None:
+                return
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('index_type', ?)",
+                (self.index_type,),
+            )
+            conn.commit()
+
+            tmp_path = self.index_path.with_suffix(".tmp")
+            faiss.write_index(self.index, str(tmp_path))
+            os.replace(tmp_path, self.index_path)
+            self.mtime = self.index_path.stat().st_mtime_ns
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                self._local.conn = None
+            self._generation += 1
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    # Packed bitmap of positions visible to every role in `bits`, cached until the next write.
+    def _mask(self, bits: int) -> np.ndarray:
+        mask = self._masks.get(bits)
+        if mask is None:
+            visible = (self.roles & bits) == bits if bits else self.roles != 0
+            mask = self._masks[bits] = np.packbits(visible, bitorder="little")
+        return mask
+
+    @staticmethod
+    def _search_params(index_type: str, selector):
+        if index_type == "hnsw_sq8":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=FAISS_EF_SEARCH)
+        if index_type == "ivfpq":
+            return faiss.SearchParametersIVF(sel=selector, nprobe=FAISS_IVF_NPROBE)
+        return faiss.SearchParameters(sel=selector)
+
+    # One FAISS search for many query vectors sharing a filter (see retrieval_batcher).
+    def similarity_search_by_vectors_with_relevance_scores(
+        self, embeddings: List[List[float]], k: int = 4, filter: Optional[Dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        filter = filter or {}
+        bits = sum(_ROLE_BITS[key] for key, value in filter.items() if key in _ROLE_BITS and value)
+        # Anything other than role flags is checked on the returned metadata.
+        extra = {key: value for key, value in filter.items() if key not in _ROLE_BITS}
+
+        # Index, mask and docstore connection from the same generation.
+        with self._lock:
+            index, index_type = self.index, self.index_type
+            if index is None or k <= 0:
+                return [[] for _ in embeddings]
+            mask = self._mask(bits)
+            conn = self._connection()
+
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(mask))
+        queries = np.asarray(embeddings, dtype=np.float32)
+        fetch = k * 4 if extra else k
+
+        distances, positions = index.search(queries, fetch, params=self._search_params(index_type, selector))
+        hits = [
+            [(int(p), float(d)) for p, d in zip(row_positions, row_distances) if p >= 0]
+            for row_positions, row_distances in zip(positions, distances)
+        ]
+
+        wanted = sorted({p for row in hits for p, _ in row})
+        rows = {}
+        for i in range(0, len(wanted), 500):
+            batch = wanted[i:i + 500]
+            for row in conn.execute(
+                f"SELECT id, text, metadata FROM chunks WHERE id IN ({','.join('?' * len(batch))})",
+                batch,
+            ):
+                rows[row[0]] = (row[1], json.loads(row[2]))
+
+        results = []
+        for row in hits:
+            found = []
+            for position, distance in row:
+                if position not in rows:
+                    continue
+                text, metadata = rows[position]
+                if any(metadata.get(key) != value for key, value in extra.items()):
+                    continue
+                found.append((Document(page_content=text, metadata=dict(metadata)), distance))
+                if len(found) == k:
+                    break
+            results.append(found)
+
+        return results
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vectors_with_relevance_scores([embedding], k, filter)[0]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter)
+
+    def stats(self) -> Dict:
+        total = self.index.ntotal if self.index is not None else 0
+        live = int(np.count_nonzero(self.roles))
+        return {
+            "index_type": self.index_type,
+            "vectors": total,
+            "live": live,
+            "tombstoned": total - live,
+            "mmapped": self.mmapped,
+        }
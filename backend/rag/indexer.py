@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from backend.rag.preprocessing import (
+    MAX_TOKENS,
+    OVERLAP,
+    iter_file_chunks,
+    iter_source_files,
+)
+from backend.rag.bm25_index import BM25_PATH, BM25Index, get_bm25_index, set_bm25_index
+from backend.rag.embedding_engine import EMBED_STREAM_SIZE, EmbeddingEngine
+from backend.rag.vector_store import (
+    DATA_DIR,
+    VECTOR_PARTITIONS,
+    delete_chunks,
+    reset_vector_store,
+    save_vector_store,
+    upsert_embedded,
+)
+
+MANIFEST_PATH = DATA_DIR / "index_manifest.json"
+
+# Bump when chunking or metadata changes so existing manifests trigger a full rebuild.
+MANIFEST_VERSION = f"chunks={MAX_TOKENS}/{OVERLAP};csv=rows;text=offsets;metadata=5" + (
+    ";partitions=department" if VECTOR_PARTITIONS else ""
+)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _flush(engine: EmbeddingEngine, lexical: BM25Index, pending: List[Document]) -> int:
+    count = len(pending)
+    if count:
+        upsert_embedded(pending, engine.embed([doc.page_content for doc in pending]))
+        lexical.upsert(pending)
+        pending.clear()
+    return count
+
+
+def load_manifest() -> Dict:
+    if not MANIFEST_PATH.exists():
+        return {}
+
+    try:
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        print("⚠️ Index manifest unreadable, rebuilding from scratch.")
+        return {}
+
+
+_version_cache = (None, "none")
+
+
+# Identifies the indexed corpus; changes whenever a run adds, updates or removes files.
+def get_index_version() -> str:
+    global _version_cache
+
+    try:
+        mtime = MANIFEST_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return "none"
+
+    if _version_cache[0] != mtime:
+        _version_cache = (mtime, load_manifest().get("index_version", str(mtime)))
+
+    return _version_cache[1]
+
+
+def save_manifest(manifest: Dict) -> None:
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+# Re-embeds only new or changed files, drops chunks of removed files, keeps the
+# BM25 index in step with the vector store and records what is in the index so
+# the next run can skip everything that did not change.
+def run_incremental_index(directories: List[Path]) -> Dict:
+    manifest = load_manifest()
+
+    # The lexical index must cover the same chunks as Chroma; without it, rebuild both.
+    if manifest and not BM25_PATH.exists():
+        print("♻️ BM25 index missing, rebuilding both indexes...")
+        manifest = {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        if manifest:
+            print("♻️ Index format changed, rebuilding vector store...")
+        reset_vector_store()
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+        lexical = BM25Index()
+    else:
+        lexical = get_bm25_index()
+
+    previous: Dict[str, Dict] = manifest["files"]
+    current: Dict[str, Dict] = {}
+    changed = []
+
+    for file, department, key in iter_source_files(directories):
+        digest = file_hash(file)
+        entry = previous.get(key)
+
+        if entry and entry["hash"] == digest:
+            current[key] = entry
+        else:
+            changed.append((key, file, department, digest))
+
+    changed_keys = {key for key, *_ in changed}
+    removed = [key for key in previous if key not in current and key not in changed_keys]
+
+    stale_ids: List[str] = []
+    for key in removed:
+        stale_ids.extend(previous[key]["chunk_ids"])
+
+    embedded_chunks = 0
+
+    if changed:
+        pending: List[Document] = []
+        chunked = iter_file_chunks((file, department, key) for key, file, department, _ in changed)
+
+        # Files are chunked in worker processes while earlier chunks are embedded
+        # and written in bounded batches, so memory does not grow with the number
+        # or size of changed files.
+        with EmbeddingEngine() as engine:
+            for (key, _, department, digest), (_, _, documents) in zip(changed, chunked):
+                chunk_ids = []
+                for document in documents:
+                    chunk_ids.append(document.metadata["chunk_id"])
+                    pending.append(document)
+                    if len(pending) >= EMBED_STREAM_SIZE:
+                        embedded_chunks += _flush(engine, lexical, pending)
+
+                old_ids = previous.get(key, {}).get("chunk_ids", [])
+                stale_ids.extend(set(old_ids) - set(chunk_ids))
+
+                current[key] = {
+                    "hash": digest,
+                    "department": department,
+                    "chunk_ids": chunk_ids,
+                }
+
+            embedded_chunks += _flush(engine, lexical, pending)
+
+    # A chunk id can move between files (e.g. a renamed file), never delete a live one.
+    live_ids = {cid for entry in current.values() for cid in entry["chunk_ids"]}
+    stale_ids = sorted(set(stale_ids) - live_ids)
+    delete_chunks(stale_ids)
+    save_vector_store()
+    lexical.delete(stale_ids)
+    set_bm25_index(lexical)
+
+    manifest["files"] = current
+    manifest["index_version"] = hashlib.sha256(
+        json.dumps(
+            [MANIFEST_VERSION, sorted((key, e["hash"]) for key, e in current.items())]
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+    save_manifest(manifest)
+
+    chunks_per_department: Dict[str, int] = {
+        directory.name.lower(): 0 for directory in directories
+    }
+    for entry in current.values():
+        chunks_per_department[entry["department"]] = (
+            chunks_per_department.get(entry["department"], 0)
+            + len(entry["chunk_ids"])
+        )
+
+    total_chunks = sum(chunks_per_department.values())
+
+    return {
+        "total_documents": total_chunks,
+        "total_chunks": total_chunks,
+        "chunks_per_department": chunks_per_department,
+        "files_added": sum(1 for key in changed_keys if key not in previous),
+        "files_updated": sum(1 for key in changed_keys if key in previous),
+        "files_removed": len(removed),
+        "files_unchanged": len(current) - len(changed_keys),
+        "chunks_embedded": embedded_chunks,
+        "chunks_deleted": len(stale_ids),
+    }
@@ -0,0 +1,79 @@
+import os
+import threading
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBED_NORMALIZE = os.getenv("EMBED_NORMALIZE", "false").lower() == "true"
+# Small CPU cross-encoder used by the optional rerank stage.
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "256"))
+
+_lock = threading.Lock()
+_model = None
+_tokenizer = None
+_cross_encoder = None
+
+
+# One SentenceTransformer per process, shared by chunking, corpus builds and queries.
+def get_sentence_transformer():
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                print("🔄 Loading embedding model...")
+                _model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    return _model
+
+
+# Loaded on first rerank only, so deployments without reranking never pay for it.
+def get_cross_encoder():
+    global _cross_encoder
+    if _cross_encoder is None:
+        with _lock:
+            if _cross_encoder is None:
+                from sentence_transformers import CrossEncoder
+                print("🔄 Loading rerank model...")
+                _cross_encoder = CrossEncoder(
+                    RERANK_MODEL,
+                    max_length=RERANK_MAX_LENGTH,
+                    device="cpu",
+                )
+    return _cross_encoder
+
+
+# Chunking only needs the tokenizer: reuse the loaded model's if there is one,
+# otherwise load the fast tokenizer alone and skip the model weights entirely.
+def get_tokenizer():
+    global _tokenizer
+    if _model is not None:
+        return _model.tokenizer
+
+    if _tokenizer is None:
+        with _lock:
+            if _tokenizer is None:
+                from transformers import AutoTokenizer
+                _tokenizer = AutoTokenizer.from_pretrained(
+                    f"sentence-transformers/{EMBEDDING_MODEL}",
+                    use_fast=True,
+                )
+    return _tokenizer
+
+
+# LangChain embeddings backed by the shared model instead of a private copy.
+class SharedEmbeddings(Embeddings):
+    def __init__(self, normalize: bool = EMBED_NORMALIZE):
+        self.normalize = normalize
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [t.replace("\n", " ") for t in texts]
+        return get_sentence_transformer().encode(
+            texts,
+            normalize_embeddings=self.normalize,
+            convert_to_numpy=True,
+        ).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
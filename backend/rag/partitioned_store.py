@@ -0,0 +1,127 @@
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from backend.rag.rbac import ROLE_DOCUMENT_MAP, role_metadata_key
+from backend.rag.retrieval_batcher import search_many
+
+# One partition per department folder (the folders pipeline.EXPECTED_FOLDERS requires).
+DEPARTMENTS = sorted({folder for folders in ROLE_DOCUMENT_MAP.values() for folder in folders})
+# Threads searching the partitions of a multi-department role (c_level reads all of
+# them); with one, partitions are searched in turn on the calling thread.
+PARTITION_SEARCH_WORKERS = int(
+    os.getenv("PARTITION_SEARCH_WORKERS", str(min(len(DEPARTMENTS), os.cpu_count() or 1)))
+)
+
+_ROLE_KEYS = {role_metadata_key(role): role for role in ROLE_DOCUMENT_MAP}
+
+
+# One Chroma collection or FAISS index per department, behind the store interface
+# the retriever and indexer use. A role filter becomes the set of partitions the
+# role may read; every chunk in them is visible to the role, so they are searched
+# without a filter and the per-partition top-k merged by distance. Search cost
+# depends on the size of the role's departments only: `employees` touches just the
+# `general` partition however large finance or engineering grow.
+class PartitionedVectorStore:
+    def __init__(self, open_partition: Callable[[str], object], embedding_function=None):
+        self._open_partition = open_partition
+        self.embedding_function = embedding_function
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid = None
+
+        # Opened up front so a pre-fork master maps every FAISS partition once.
+        self.partitions: Dict[str, object] = {
+            department: open_partition(department) for department in DEPARTMENTS
+        }
+
+    # Chunks from a folder outside ROLE_DOCUMENT_MAP still get a partition; no role reads it.
+    def partition(self, department: str):
+        store = self.partitions.get(department)
+        if store is None:
+            with self._lock:
+                store = self.partitions.get(department)
+                if store is None:
+                    store = self.partitions[department] = self._open_partition(department)
+        return store
+
+    # Threads do not survive a fork, so each worker process starts its own pool.
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=PARTITION_SEARCH_WORKERS, thread_name_prefix="partition"
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    # Partitions a filter selects, and what is left of the filter for each of them.
+    def _route(self, filter: Optional[Dict]) -> Tuple[List[str], Dict]:
+        filter = filter or {}
+        roles = [_ROLE_KEYS[key] for key, value in filter.items() if key in _ROLE_KEYS and value]
+        rest = {key: value for key, value in filter.items() if not (key in _ROLE_KEYS and value)}
+
+        departments = list(self.partitions)
+        for role in roles:
+            departments = [d for d in departments if d in ROLE_DOCUMENT_MAP[role]]
+        return departments, rest
+
+    def similarity_search_by_vectors_with_relevance_scores(
+        self, embeddings: List[List[float]], k: int = 4, filter: Optional[Dict] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        departments, rest = self._route(filter)
+        if not departments or k <= 0:
+            return [[] for _ in embeddings]
+
+        def search(department: str):
+            return search_many(self.partition(department), embeddings, k, rest)
+
+        if len(departments) == 1 or PARTITION_SEARCH_WORKERS <= 1:
+            found = [search(department) for department in departments]
+        else:
+            found = list(self._executor().map(search, departments))
+
+        # Same model and metric in every partition, so distances compare directly.
+        return [
+            heapq.nsmallest(k, (hit for hits in found for hit in hits[i]), key=lambda hit: hit[1])
+            for i in range(len(embeddings))
+        ]
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vectors_with_relevance_scores([embedding], k, filter)[0]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict] = None
+    ) -> List[Tuple[Document, float]]:
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter)
+
+    # Chunk ids start with their department ("hr/leave.md::chunk_0").
+    def delete(self, ids: List[str]) -> None:
+        by_department: Dict[str, List[str]] = {}
+        for chunk_id in ids:
+            by_department.setdefault(chunk_id.split("/", 1)[0], []).append(chunk_id)
+        for department, chunk_ids in by_department.items():
+            self.partition(department).delete(ids=chunk_ids)
+
+    def save(self) -> None:
+        for store in list(self.partitions.values()):
+            if hasattr(store, "save"):
+                store.save()
+
+    def refresh(self) -> None:
+        for store in list(self.partitions.values()):
+            if hasattr(store, "refresh"):
+                store.refresh()
+
+    def delete_collection(self) -> None:
+        for store in list(self.partitions.values()):
+            store.delete_collection()
+        self.partitions.clear()
@@ -1,5 +1,4 @@
-from backend.rag.preprocessing import preprocess
-from backend.rag.vector_store import build_vector_store
+from backend.rag.indexer import run_incremental_index
 from pathlib import Path
 
 BASE_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "Fintech-data"
@@ -22,11 +21,9 @@ def run_pipeline_once():
             f"❌ Missing required data folders: {sorted(missing)}"
         )
 
-    result = preprocess(directories)
-    build_vector_store(result["documents"])
+    return run_incremental_index(directories)
+
+
+if __name__ == "__main__":
+    print(run_pipeline_once())
 
-    return {
-        "total_documents": result["total_documents"],
-        "total_chunks": result["total_chunks"],
-        "chunks_per_department": result["chunks_per_department"],
-    }
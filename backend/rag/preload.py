@@ -0,0 +1,57 @@
+import gc
+import os
+
+from backend.rag.bm25_index import get_bm25_index
+from backend.rag.model_registry import get_cross_encoder, get_tokenizer
+from backend.rag.reranker import RERANK
+from backend.rag.retriever import HYBRID_SEARCH
+from backend.rag.tabular_engine import TABULAR_QUERIES, tabular_store
+from backend.rag.vector_store import VECTOR_BACKEND, get_embeddings, get_vector_store
+
+# Torch intra-op threads per worker. One worker per core with one thread each
+# avoids oversubscribing the CPU; raise it when running fewer workers than cores.
+WORKER_TORCH_THREADS = int(os.getenv("WORKER_TORCH_THREADS", "1"))
+
+
+def _set_torch_threads(count: int) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(count)
+
+
+# Loads every model and index a request needs in the current process. Called in
+# the gunicorn master before workers are forked (see backend/gunicorn.conf.py), so
+# model weights, the BM25 index and CSV tables are shared copy-on-write and the
+# FAISS index is shared through the page cache of its memory-mapped file.
+def preload_shared_state() -> None:
+    print("🔄 Preloading models and indexes...")
+
+    # Warm-up inference runs single-threaded, so no OpenMP thread pool exists at
+    # fork time (it does not survive a fork); after_fork() sets the worker count.
+    _set_torch_threads(1)
+
+    get_tokenizer()
+    get_embeddings().embed_query("warm up")
+
+    # Chroma holds SQLite handles and background threads that must not cross a
+    # fork; with that backend each worker opens its own copy of the collection.
+    if VECTOR_BACKEND == "faiss":
+        get_vector_store()
+
+    if HYBRID_SEARCH:
+        get_bm25_index()
+    if RERANK:
+        get_cross_encoder().predict([("warm up", "warm up")], show_progress_bar=False)
+    if TABULAR_QUERIES:
+        tabular_store.tables()
+
+    # Objects allocated so far are never scanned by the cyclic GC again, so the
+    # collector does not write to (and un-share) their pages in every worker.
+    gc.freeze()
+
+
+# Per-worker setup after the fork.
+def after_fork() -> None:
+    _set_torch_threads(WORKER_TORCH_THREADS)
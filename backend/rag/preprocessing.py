@@ -1,86 +1,303 @@
+import os
 import re
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterable, Iterator, List, Tuple
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 from langchain_core.documents import Document
 
-from backend.rag.rbac import roles_for_department
+from backend.rag.model_registry import get_tokenizer
+from backend.rag.rbac import roles_for_department, role_metadata
 
-MAX_TOKENS = 256  
-OVERLAP = 50      
+# Tokens per text chunk and shared between neighbouring chunks. The embedding
+# model truncates input at 256 tokens, so larger chunks are only partly embedded.
+MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
+
+# Text windows advance by MAX_TOKENS - OVERLAP tokens; anything else never ends.
+if MAX_TOKENS <= 0 or not 0 <= OVERLAP < MAX_TOKENS:
+    raise ValueError(
+        f"Invalid chunking: CHUNK_MAX_TOKENS={MAX_TOKENS} must be positive and "
+        f"CHUNK_OVERLAP={OVERLAP} in [0, CHUNK_MAX_TOKENS)."
+    )
+
+SUPPORTED_SUFFIXES = {".md", ".txt", ".csv"}
+
+# Rows pandas reads per batch; bounds memory for large exports.
+CSV_READ_ROWS = int(os.getenv("CSV_READ_ROWS", "10000"))
+
+# Processes that read, clean, tokenize and chunk text files during a build.
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(os.cpu_count() or 1)))
+# Text files handed to a worker at once; their texts share one tokenizer call.
+PREPROCESS_BATCH_FILES = int(os.getenv("PREPROCESS_BATCH_FILES", "32"))
+# Worker batches queued or running at any time, so memory does not grow with the corpus.
+PREPROCESS_MAX_INFLIGHT = int(os.getenv("PREPROCESS_MAX_INFLIGHT", str(2 * PREPROCESS_WORKERS)))
+
+# Fresh interpreters: forking after the fast tokenizer has run can deadlock it.
+_MP_CONTEXT = "spawn"
+
+_SEPARATOR_RUN = re.compile(r"[-_]{3,}")
+_SPACED_DASHES = re.compile(r"(?:-\s*){5,}")
+_WHITESPACE = re.compile(r"\s+")
 
 def _clean(text: str) -> str:
-    text = re.sub(r"[-_]{3,}", " ", text)
-    text = re.sub(r"(?:-\s*){5,}", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    text = _SEPARATOR_RUN.sub(" ", text)
+    text = _SPACED_DASHES.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text)
     return text.strip()
 
 def _read_file(path: Path) -> str:
-    if path.suffix == ".csv":
-        return pd.read_csv(path).to_string(index=False)
     if path.suffix in {".md", ".txt"}:
         return path.read_text(encoding="utf-8", errors="ignore")
     return ""
 
-def preprocess(directories: List[Path]) -> Dict:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    tokenizer = model.tokenizer
 
-    documents: List[Document] = []
-    total_chunks = 0
-    chunks_per_department: Dict[str, int] = {}
+# `source` (see iter_source_files) keys the chunk ids, so files that share a name
+# in different departments or subfolders do not overwrite each other's vectors.
+def _chunk_metadata(file: Path, department: str, source: str, idx: int) -> Dict:
+    return {
+        "chunk_id": f"{source}::chunk_{idx}",
+        "source_path": str(file.name),
+        "department": department,
+        "accessible_roles": ",".join(roles_for_department(department)),
+        **role_metadata(department),
+    }
+
+
+def _metadata_key(column: str) -> str:
+    return "num_" + re.sub(r"\W+", "_", column.strip().lower()).strip("_")
+
+
+def _numeric_columns(batch: pd.DataFrame) -> Dict[str, np.ndarray]:
+    return {
+        _metadata_key(str(column)): batch[column].to_numpy(dtype=float)
+        for column in batch.columns
+        if pd.api.types.is_numeric_dtype(batch[column])
+        and not pd.api.types.is_bool_dtype(batch[column])
+    }
+
 
+# Min/max of every numeric column over rows [start, end), e.g. num_salary_min, so
+# lookups like "salary above X" can be pushed into the vector store filter.
+def _numeric_metadata(columns: Dict[str, np.ndarray], start: int, end: int) -> Dict[str, float]:
+    metadata: Dict[str, float] = {}
+
+    for key, values in columns.items():
+        window = values[start:end]
+        window = window[~np.isnan(window)]
+        if window.size:
+            metadata[f"{key}_min"] = float(window.min())
+            metadata[f"{key}_max"] = float(window.max())
+
+    return metadata
+
+
+# Reads the CSV in CSV_READ_ROWS batches and packs complete rows into chunks of at
+# most MAX_TOKENS, each starting with the header line so every chunk is readable
+# on its own. A single row longer than the budget becomes its own chunk.
+def _iter_csv_chunks(file: Path, department: str, source: str, tokenizer) -> Iterator[Document]:
+    idx = 0
+    row_offset = 0
+    header = None
+
+    for batch in pd.read_csv(file, chunksize=CSV_READ_ROWS):
+        if header is None:
+            header = ", ".join(str(column) for column in batch.columns)
+            header_tokens = len(tokenizer(header, add_special_tokens=False)["input_ids"])
+
+        cells = batch.astype(str).where(batch.notna(), "")
+        lines = [_clean(", ".join(row)) for row in cells.itertuples(index=False, name=None)]
+        numeric = _numeric_columns(batch)
+        # One tokenizer call per batch instead of one per row.
+        row_tokens = [
+            len(ids)
+            for ids in tokenizer(lines, add_special_tokens=False)["input_ids"]
+        ]
+
+        start = 0
+        while start < len(lines):
+            end = start + 1
+            used = header_tokens + row_tokens[start]
+            while end < len(lines) and used + row_tokens[end] <= MAX_TOKENS:
+                used += row_tokens[end]
+                end += 1
+
+            yield Document(
+                page_content="\n".join([header] + lines[start:end]),
+                metadata={
+                    **_chunk_metadata(file, department, source, idx),
+                    "row_start": row_offset + start,
+                    "row_end": row_offset + end - 1,
+                    **_numeric_metadata(numeric, start, end),
+                },
+            )
+
+            idx += 1
+            start = end
+
+        row_offset += len(lines)
+
+# Yields (file, department, source) for every supported file under the given
+# department folders. `source` is the department plus the path inside its folder
+# ("hr/policies/leave.md"): unique across the corpus, it keys chunk ids and the
+# index manifest.
+def iter_source_files(directories: List[Path]) -> Iterator[Tuple[Path, str, str]]:
     for directory in directories:
         department = directory.name.lower()
-        chunks_per_department.setdefault(department, 0)
 
         for file in directory.rglob("*"):
-            if file.suffix not in {".md", ".txt", ".csv"}:
+            if file.suffix not in SUPPORTED_SUFFIXES:
                 continue
 
-            raw = _clean(_read_file(file))
-            if not raw:
-                continue
+            yield file, department, f"{department}/{file.relative_to(directory).as_posix()}"
+
+# Overlapping MAX_TOKENS windows over a cleaned text file. Each chunk is a slice
+# of `text` cut at token boundaries; char_start/char_end locate it in that text.
+def _window_chunks(
+    file: Path, department: str, source: str, text: str, offsets: List[Tuple[int, int]]
+) -> Iterator[Document]:
+    start = 0
+    idx = 0
+
+    while start < len(offsets):
+        end = min(start + MAX_TOKENS, len(offsets))
+        char_start, char_end = offsets[start][0], offsets[end - 1][1]
+
+        yield Document(
+            page_content=text[char_start:char_end],
+            metadata={
+                **_chunk_metadata(file, department, source, idx),
+                "char_start": char_start,
+                "char_end": char_end,
+            },
+        )
+
+        idx += 1
+        start += (MAX_TOKENS - OVERLAP)
+
+
+# Character span of every token; the token ids themselves are not needed.
+def _token_offsets(texts: List[str], tokenizer) -> List[List[Tuple[int, int]]]:
+    return tokenizer(
+        texts,
+        add_special_tokens=False,
+        truncation=False,
+        return_attention_mask=False,
+        return_offsets_mapping=True,
+    )["offset_mapping"]
+
+
+# Yields the chunks of one file; CSVs are split on row boundaries, text files into
+# overlapping token windows.
+def iter_chunks(file: Path, department: str, source: str, tokenizer) -> Iterator[Document]:
+    if file.suffix == ".csv":
+        yield from _iter_csv_chunks(file, department, source, tokenizer)
+        return
+
+    raw = _clean(_read_file(file))
+    if not raw:
+        return
+
+    yield from _window_chunks(file, department, source, raw, _token_offsets([raw], tokenizer)[0])
+
+
+def chunk_file(file: Path, department: str, source: str, tokenizer) -> List[Document]:
+    return list(iter_chunks(file, department, source, tokenizer))
+
+
+# Worker task: reads and cleans a batch of text files, tokenizes them in one call
+# and returns each file's chunks.
+def _chunk_text_batch(files: List[Tuple[Path, str, str]]) -> List[List[Document]]:
+    texts = [_clean(_read_file(file)) for file, _, _ in files]
+
+    return [
+        list(_window_chunks(file, department, source, text, offsets))
+        for (file, department, source), text, offsets in zip(
+            files, texts, _token_offsets(texts, get_tokenizer())
+        )
+    ]
+
+
+# Splits the file stream into work units: each CSV alone (streamed in this
+# process), and runs of up to `batch_files` consecutive text files.
+def _work_units(
+    files: Iterable[Tuple[Path, str, str]], batch_files: int
+) -> Iterator[Tuple[bool, List[Tuple[Path, str, str]]]]:
+    run: List[Tuple[Path, str, str]] = []
+
+    for file, department, source in files:
+        if file.suffix == ".csv":
+            if run:
+                yield False, run
+                run = []
+            yield True, [(file, department, source)]
+            continue
+
+        run.append((file, department, source))
+        if len(run) == batch_files:
+            yield False, run
+            run = []
+
+    if run:
+        yield False, run
+
+
+# Streams (file, department, chunks) for every file, in input order. Text files
+# are chunked PREPROCESS_BATCH_FILES at a time in a process pool with at most
+# PREPROCESS_MAX_INFLIGHT batches outstanding; CSVs stream from this process in
+# row batches. Consume each file's chunks before asking for the next file.
+def iter_file_chunks(
+    files: Iterable[Tuple[Path, str, str]],
+    workers: int = PREPROCESS_WORKERS,
+    batch_files: int = PREPROCESS_BATCH_FILES,
+) -> Iterator[Tuple[Path, str, Iterable[Document]]]:
+    tokenizer = get_tokenizer()
+
+    def results(unit: List[Tuple[Path, str, str]], chunks) -> Iterator:
+        if chunks is None:
+            (file, department, source), = unit
+            yield file, department, iter_chunks(file, department, source, tokenizer)
+            return
+        for (file, department, _), documents in zip(unit, chunks):
+            yield file, department, documents
+
+    if workers <= 1:
+        for is_csv, unit in _work_units(files, batch_files):
+            yield from results(unit, None if is_csv else _chunk_text_batch(unit))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context(_MP_CONTEXT)) as pool:
+        pending = deque()
+
+        for is_csv, unit in _work_units(files, batch_files):
+            pending.append((unit, None if is_csv else pool.submit(_chunk_text_batch, unit)))
+
+            while len(pending) > PREPROCESS_MAX_INFLIGHT:
+                unit, future = pending.popleft()
+                yield from results(unit, future and future.result())
+
+        while pending:
+            unit, future = pending.popleft()
+            yield from results(unit, future and future.result())
+
+
+def preprocess(directories: List[Path]) -> Dict:
+    documents: List[Document] = []
+    chunks_per_department: Dict[str, int] = {
+        directory.name.lower(): 0 for directory in directories
+    }
 
-            token_ids = tokenizer(
-                raw,
-                add_special_tokens=False,
-                truncation=False,
-                return_attention_mask=False,
-            )["input_ids"]
-
-            start = 0
-            idx = 0
-
-            while start < len(token_ids):
-                end = min(start + MAX_TOKENS, len(token_ids))
-                chunk_ids = token_ids[start:end]
-                text = tokenizer.decode(chunk_ids)
-
-                roles = roles_for_department(department)
-
-                documents.append(
-                    Document(
-                        page_content=text,
-                        metadata={
-                            "chunk_id": f"{file.name}::chunk_{idx}",
-                            "source_path": str(file.name), 
-                            "department": department,
-                            "accessible_roles": ",".join(roles),
-                        },
-                    )
-                )
-
-                total_chunks += 1
-                chunks_per_department[department] += 1
-
-                idx += 1
-                start += (MAX_TOKENS - OVERLAP)
+    for _, department, chunks in iter_file_chunks(iter_source_files(directories)):
+        chunks = list(chunks)
+        documents.extend(chunks)
+        chunks_per_department[department] += len(chunks)
 
     return {
         "documents": documents,
         "total_documents": len(documents),
-        "total_chunks": total_chunks,
+        "total_chunks": len(documents),
         "chunks_per_department": chunks_per_department,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,61 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+
+# Lower-casing is lossless for the uncased MiniLM tokenizer, so "Leave policy?" and
+# "leave  policy?" share one embedding.
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+# Bounded, thread-safe LRU in front of `embed_query`. Document embedding is passed
+# straight through: corpus builds never repeat texts.
+class CachedQueryEmbeddings(Embeddings):
+    def __init__(self, base: Embeddings, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.base = base
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            self.misses += 1
+
+        vector = tuple(self.base.embed_query(key))
+
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+        return list(vector)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._cache),
+                "max_size": self.max_size,
+            }
@@ -1,44 +1,266 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
 from backend.rag.retriever import secure_search_with_scores
 from backend.rag.citation_utils import extract_citations
 from backend.rag.confidence_utils import calculate_confidence_from_scores
-from backend.llm.llm_client import LLMClient
+from backend.rag.context_packer import pack_context
+from backend.rag.answer_cache import SemanticAnswerCache
+from backend.rag.indexer import get_index_version
+from backend.rag.reranker import RERANK, RERANK_CANDIDATES, RERANK_TOP_N, reranker
+from backend.rag.retrieval_batcher import RETRIEVAL_BATCH_SIZE_LIMIT, RETRIEVAL_BATCHING
+from backend.rag.tabular_engine import TABULAR_CONFIDENCE, answer_tabular
+from backend.llm.llm_client import ERROR_MESSAGE, get_llm_client
 from backend.llm.prompt_templates import build_prompt
-from backend.rag.vector_store import get_vector_store
+from backend.rag.vector_store import get_embeddings, get_vector_store
+from backend.monitoring.metrics import CONTEXT_TOKENS, RETRIEVED_CHUNKS, stage
 
 FALLBACK_MESSAGE = "The requested information is not available in the provided documents."
 
+# Query embedding and vector search are CPU-bound; they run on this many threads.
+# With batching the threads mostly wait for a shared batch, so allow one per slot.
+RETRIEVAL_WORKERS = int(os.getenv(
+    "RETRIEVAL_WORKERS",
+    str(RETRIEVAL_BATCH_SIZE_LIMIT if RETRIEVAL_BATCHING else min(8, os.cpu_count() or 1)),
+))
+# Requests allowed to run or wait for a retrieval thread before new ones are rejected.
+RETRIEVAL_MAX_PENDING = int(os.getenv("RETRIEVAL_MAX_PENDING", "64"))
+# How long a request may wait for a free slot before it is rejected.
+RETRIEVAL_QUEUE_TIMEOUT = float(os.getenv("RETRIEVAL_QUEUE_TIMEOUT", "2.0"))
+
+
+class PipelineSaturatedError(RuntimeError):
+    pass
+
 
 class RAGPipeline:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
+        self.answer_cache = SemanticAnswerCache()
+        self._executor = ThreadPoolExecutor(
+            max_workers=RETRIEVAL_WORKERS,
+            thread_name_prefix="retrieval",
+        )
+        self._slots = asyncio.Semaphore(RETRIEVAL_MAX_PENDING)
 
-    def run(self, user_role: str, query: str, k: int = 15):
-        vector_store = get_vector_store() 
+    # Returns {"cached": result} on an answer-cache hit, otherwise the search
+    # results plus what is needed to cache the answer once it is generated.
+    def _retrieve(self, user_role: str, query: str, k: int) -> Dict:
+        index_version = get_index_version()
 
-        results = secure_search_with_scores(
-            vector_store,
-            query,
+        with stage("answer_cache"):
+            cached = self.answer_cache.get(user_role, k, query, index_version)
+        if cached is not None:
+            return {"cached": cached}
+
+        # Aggregate questions over CSV sources are computed, not searched for; the
+        # small result table is the only context the LLM sees. Without an embedding
+        # the answer is cached for this exact question only, never for a similar one.
+        with stage("tabular_query"):
+            table = answer_tabular(user_role, query)
+        if table is not None:
+            RETRIEVED_CHUNKS.observe(1)
+            return {
+                "cached": None,
+                "results": [],
+                "table": table,
+                "embedding": None,
+                "index_version": index_version,
+            }
+
+        with stage("embed_query"):
+            embedding = get_embeddings().embed_query(query)
+
+        with stage("answer_cache"):
+            cached = self.answer_cache.get_similar(user_role, k, embedding, index_version)
+        if cached is not None:
+            return {"cached": cached}
+
+        # With reranking, retrieval over-fetches and the cross-encoder keeps the
+        # few chunks that actually answer the question.
+        with stage("vector_search"):
+            results = secure_search_with_scores(
+                get_vector_store(),
+                query,
+                user_role,
+                max(k, RERANK_CANDIDATES) if RERANK else k,
+                embedding=embedding,
+            )
+
+        if RERANK:
+            with stage("rerank"):
+                results = reranker.rerank(query, results, min(k, RERANK_TOP_N))
+        RETRIEVED_CHUNKS.observe(len(results))
+
+        return {
+            "cached": None,
+            "results": results,
+            "embedding": embedding,
+            "index_version": index_version,
+        }
+
+    # Documents the LLM will see: merged, deduplicated and cut to the token budget.
+    def _pack(self, results) -> List[Document]:
+        with stage("pack_context"):
+            documents, tokens = pack_context(results)
+        CONTEXT_TOKENS.observe(tokens)
+        return documents
+
+    # Documents for the prompt and the answer confidence. A computed table has no
+    # search distance, so it reports TABULAR_CONFIDENCE instead of a score-based one.
+    def _context(self, retrieval: Dict) -> Tuple[List[Document], float]:
+        table = retrieval.get("table")
+        if table is not None:
+            return [table], TABULAR_CONFIDENCE
+
+        results = retrieval["results"]
+        if not results:
+            return [], 0.0
+        return self._pack(results), calculate_confidence_from_scores(results)
+
+    def _remember(self, user_role: str, query: str, k: int, retrieval: Dict, result: Dict):
+        if result["answer"] == ERROR_MESSAGE:
+            return
+
+        self.answer_cache.put(
             user_role,
             k,
+            query,
+            retrieval["embedding"],
+            retrieval["index_version"],
+            result,
         )
 
-        if not results:
-            return {
+    def run(self, user_role: str, query: str, k: int = 15):
+        retrieval = self._retrieve(user_role, query, k)
+        if retrieval["cached"] is not None:
+            return retrieval["cached"]
+
+        documents, confidence = self._context(retrieval)
+
+        if not documents:
+            result = {
                 "answer": FALLBACK_MESSAGE,
                 "confidence": 0.0,
                 "citations": [],
             }
+        else:
+            with stage("build_prompt"):
+                prompt = build_prompt(query, documents)
 
-        documents = [doc for doc, _ in results]
-        prompt = build_prompt(query, documents)
+            with stage("llm_generate"):
+                answer = self.llm.generate(prompt)
 
-        answer = self.llm.generate(prompt)
+            result = {
+                "answer": answer,
+                "confidence": confidence,
+                "citations": extract_citations(documents),
+            }
 
-        return {
-            "answer": answer,
-            "confidence": calculate_confidence_from_scores(results),
+        self._remember(user_role, query, k, retrieval, result)
+        return result
+
+    # Runs retrieval on the bounded executor. Raises PipelineSaturatedError when no
+    # slot frees up in time, so callers can shed load instead of queueing forever.
+    async def aretrieve(self, user_role: str, query: str, k: int = 15) -> Dict:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), RETRIEVAL_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise PipelineSaturatedError("Retrieval queue is full")
+
+        try:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor,
+                context.run,
+                self._retrieve,
+                user_role,
+                query,
+                k,
+            )
+        finally:
+            self._slots.release()
+
+    async def arun(self, user_role: str, query: str, k: int = 15):
+        retrieval = await self.aretrieve(user_role, query, k)
+        if retrieval["cached"] is not None:
+            return retrieval["cached"]
+
+        documents, confidence = self._context(retrieval)
+
+        if not documents:
+            result = {
+                "answer": FALLBACK_MESSAGE,
+                "confidence": 0.0,
+                "citations": [],
+            }
+        else:
+            with stage("build_prompt"):
+                prompt = build_prompt(query, documents)
+
+            with stage("llm_generate"):
+                answer = await self.llm.agenerate(prompt)
+
+            result = {
+                "answer": answer,
+                "confidence": confidence,
+                "citations": extract_citations(documents),
+            }
+
+        self._remember(user_role, query, k, retrieval, result)
+        return result
+
+    # Yields a "context" event (citations + confidence) for an `aretrieve` result,
+    # then "token" events as the LLM produces text, then "done".
+    async def astream(
+        self, user_role: str, query: str, k: int, retrieval: Dict
+    ) -> AsyncIterator[Dict]:
+        cached = retrieval["cached"]
+        if cached is not None:
+            yield {
+                "event": "context",
+                "confidence": cached["confidence"],
+                "citations": cached["citations"],
+            }
+            yield {"event": "token", "text": cached["answer"]}
+            yield {"event": "done"}
+            return
+
+        documents, confidence = self._context(retrieval)
+
+        if not documents:
+            yield {"event": "context", "confidence": 0.0, "citations": []}
+            yield {"event": "token", "text": FALLBACK_MESSAGE}
+            yield {"event": "done"}
+            return
+
+        result = {
+            "confidence": confidence,
             "citations": extract_citations(documents),
         }
 
+        yield {"event": "context", **result}
+
+        with stage("build_prompt"):
+            prompt = build_prompt(query, documents)
+        parts = []
+
+        with stage("llm_generate"):
+            async for text in self.llm.agenerate_stream(prompt):
+                parts.append(text)
+                yield {"event": "token", "text": text}
+
+        yield {"event": "done"}
+
+        result["answer"] = "".join(parts).strip()
+        if ERROR_MESSAGE not in result["answer"]:
+            self._remember(user_role, query, k, retrieval, result)
+
 
-rag_pipeline = RAGPipeline()
\ No newline at end of file
+rag_pipeline = RAGPipeline()
@@ -32,3 +32,13 @@ def roles_for_department(department: str) -> List[str]:
             allowed_roles.append(role)
             
     return sorted(allowed_roles)
+
+def role_metadata_key(role: str) -> str:
+    return f"role_{role}"
+
+# One boolean flag per role so visibility can be pushed into the vector store `where` filter.
+def role_metadata(department: str) -> Dict[str, bool]:
+    return {
+        role_metadata_key(role): department in folders
+        for role, folders in ROLE_DOCUMENT_MAP.items()
+    }
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from backend.rag.model_registry import get_cross_encoder
+from backend.rag.query_embedding_cache import normalize_query
+
+# Rescore retrieved chunks with a cross-encoder and keep only the best few.
+RERANK = os.getenv("RERANK", "false").lower() == "true"
+# Chunks retrieved for reranking (at least the request's k).
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "30"))
+# Chunks kept after reranking (at most the request's k).
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "4"))
+# Query/chunk pairs scored per cross-encoder forward pass.
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+# Time a request may spend reranking before falling back to retrieval order.
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "200"))
+# Query/chunk pair scores kept in memory.
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "8192"))
+
+# Batches smaller than this are mostly fixed per-call overhead, so their time per
+# pair is only an upper bound on the real cost.
+_MIN_SAMPLE_PAIRS = 4
+
+
+# Orders retrieval results by cross-encoder relevance. Pair scores are cached per
+# (query, chunk) so repeated and overlapping questions only score new chunks.
+# Results keep their retrieval distances, so confidence stays on the same scale.
+class Reranker:
+    def __init__(self, max_size: int = RERANK_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.reranked = 0
+        self.fallbacks = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Moving average of seconds per scored pair, used to size batches to the
+        # time left in the budget.
+        self._pair_seconds: Optional[float] = None
+
+    def _lookup(self, keys: List[Tuple]) -> List[Optional[float]]:
+        scores = []
+        with self._lock:
+            for key in keys:
+                score = self._cache.get(key)
+                if score is None:
+                    self.misses += 1
+                else:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                scores.append(score)
+        return scores
+
+    def _store(self, keys: List[Tuple], scores: List[float], seconds: float) -> None:
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+            per_pair = seconds / len(keys)
+            if self._pair_seconds is None:
+                self._pair_seconds = per_pair
+            elif len(keys) >= _MIN_SAMPLE_PAIRS:
+                self._pair_seconds = 0.8 * self._pair_seconds + 0.2 * per_pair
+            else:
+                self._pair_seconds = min(self._pair_seconds, per_pair)
+
+    # Returns the `top_n` most relevant results. When scoring would overrun
+    # `budget_ms`, returns the first `top_n` in retrieval order instead; pairs
+    # scored before that point are still cached for the next request.
+    def rerank(
+        self,
+        query: str,
+        results: List[Tuple[Document, float]],
+        top_n: int = RERANK_TOP_N,
+        budget_ms: float = RERANK_BUDGET_MS,
+    ) -> List[Tuple[Document, float]]:
+        if len(results) <= 1:
+            return results[:top_n]
+
+        # Loaded outside the budget: the first request must not always fall back.
+        model = get_cross_encoder()
+        deadline = time.perf_counter() + budget_ms / 1000
+
+        query = normalize_query(query)
+        keys = [
+            (query, doc.metadata.get("chunk_id"), hash(doc.page_content))
+            for doc, _ in results
+        ]
+        scores = self._lookup(keys)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        first = True
+
+        while missing:
+            # Shrink the batch to what fits in the remaining time, so a repeated
+            # question keeps filling the cache even when it cannot finish.
+            remaining = deadline - time.perf_counter()
+            fits = RERANK_BATCH_SIZE
+            if self._pair_seconds:
+                fits = int(min(fits, remaining / self._pair_seconds))
+            if first:
+                # One batch always runs: an estimate inflated by a cold start or a
+                # GC pause must not stop reranking for good, and this batch's
+                # timing corrects it.
+                fits, first = max(fits, 1), False
+            elif remaining <= 0 or fits < 1:
+                with self._lock:
+                    self.fallbacks += 1
+                return results[:top_n]
+
+            batch, missing = missing[:fits], missing[fits:]
+
+            began = time.perf_counter()
+            predicted = model.predict(
+                [(query, results[i][0].page_content) for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+            predicted = [float(score) for score in predicted]
+            self._store([keys[i] for i in batch], predicted, time.perf_counter() - began)
+
+            for i, score in zip(batch, predicted):
+                scores[i] = score
+
+        with self._lock:
+            self.reranked += 1
+
+        # Stable sort: ties keep retrieval order.
+        order = sorted(range(len(results)), key=lambda i: -scores[i])
+        return [results[i] for i in order[:top_n]]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "reranked": self.reranked,
+                "fallbacks": self.fallbacks,
+            }
+
+
+reranker = Reranker()
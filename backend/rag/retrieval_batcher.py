@@ -0,0 +1,182 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from backend.monitoring.metrics import RETRIEVAL_BATCH_SIZE
+
+# Collect concurrent query embeddings and vector searches into micro-batches.
+RETRIEVAL_BATCHING = os.getenv("RETRIEVAL_BATCHING", "true").lower() == "true"
+# Largest number of queries embedded or searched in one call.
+RETRIEVAL_BATCH_SIZE_LIMIT = int(os.getenv("RETRIEVAL_BATCH_SIZE", "32"))
+# How long the first query of a batch waits for others to join under load.
+RETRIEVAL_BATCH_WAIT_MS = float(os.getenv("RETRIEVAL_BATCH_WAIT_MS", "2"))
+
+
+# Runs `fn(items) -> results` on a background thread for whatever callers
+# submitted while the previous batch was running, plus anything arriving within
+# `max_wait_ms` of the first item. The wait only applies while batches are
+# actually forming, so a lone caller is not delayed. Each caller blocks on its
+# own Future.
+class MicroBatcher:
+    def __init__(
+        self,
+        fn: Callable[[List], List],
+        name: str,
+        max_size: int = RETRIEVAL_BATCH_SIZE_LIMIT,
+        max_wait_ms: float = RETRIEVAL_BATCH_WAIT_MS,
+    ):
+        self.fn = fn
+        self.name = name
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._last_size = 0
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._pid = None
+
+    # The worker thread is started on first use, and again in a forked child,
+    # where the parent's thread does not exist.
+    def _ensure_started(self) -> queue.SimpleQueue:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    threading.Thread(
+                        target=self._run,
+                        args=(self._queue,),
+                        name=f"batcher-{self.name}",
+                        daemon=True,
+                    ).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def submit(self, item) -> Future:
+        future = Future()
+        self._ensure_started().put((item, future))
+        return future
+
+    def _collect(self, pending: queue.SimpleQueue) -> List[Tuple]:
+        batch = [pending.get()]
+        deadline = time.monotonic() + (self.max_wait if self._last_size > 1 else 0)
+
+        while len(batch) < self.max_size:
+            try:
+                batch.append(pending.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    # A failure anywhere in an iteration fails that batch's futures; the thread
+    # itself never dies, or every later caller would block forever.
+    def _run(self, pending: queue.SimpleQueue) -> None:
+        while True:
+            batch = self._collect(pending)
+            try:
+                self._last_size = len(batch)
+                RETRIEVAL_BATCH_SIZE.observe(len(batch), batcher=self.name)
+                with self._lock:
+                    self.batches += 1
+                    self.items += len(batch)
+
+                results = list(self.fn([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"{self.name} batch returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            }
+
+
+# Query embeddings answered by one `embed_documents` forward pass per batch.
+# Sits behind the query-embedding cache, so only cache misses are batched.
+class BatchedQueryEmbeddings(Embeddings):
+    def __init__(self, base: Embeddings):
+        self.base = base
+        self.batcher = MicroBatcher(base.embed_documents, "embed")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.batcher.submit(text).result()
+
+
+# One vector search for several query vectors with the same store, k and filter.
+def search_many(vector_store, embeddings: List[List[float]], k: int, filter: Dict):
+    if hasattr(vector_store, "similarity_search_by_vectors_with_relevance_scores"):
+        return vector_store.similarity_search_by_vectors_with_relevance_scores(embeddings, k, filter)
+
+    # Chroma: the collection answers several query embeddings in one call.
+    response = vector_store._collection.query(
+        query_embeddings=embeddings,
+        n_results=k,
+        where=filter or None,
+        include=["documents", "metadatas", "distances"],
+    )
+    return [
+        [
+            (Document(page_content=text, metadata=metadata or {}), distance)
+            for text, metadata, distance in zip(texts, metadatas, distances)
+        ]
+        for texts, metadatas, distances in zip(
+            response["documents"], response["metadatas"], response["distances"]
+        )
+    ]
+
+
+# Groups a batch by (store, k, filter) - in practice by role - and fans the
+# results back out in submission order.
+def _search_batch(items: List[Tuple]) -> List[List[Tuple[Document, float]]]:
+    groups: Dict[Tuple, List[int]] = {}
+    for i, (vector_store, _, k, filter) in enumerate(items):
+        groups.setdefault((id(vector_store), k, tuple(sorted(filter.items()))), []).append(i)
+
+    results: List = [None] * len(items)
+    for indices in groups.values():
+        vector_store, _, k, filter = items[indices[0]]
+        found = search_many(vector_store, [items[i][1] for i in indices], k, filter)
+        for i, hits in zip(indices, found):
+            results[i] = hits
+
+    return results
+
+
+_search_batcher = MicroBatcher(_search_batch, "search")
+
+
+def batched_search(
+    vector_store, embedding: List[float], k: int, filter: Dict
+) -> List[Tuple[Document, float]]:
+    return _search_batcher.submit((vector_store, embedding, k, filter)).result()
+
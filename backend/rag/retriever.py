@@ -1,7 +1,19 @@
-from typing import List, Tuple
+import os
+from typing import Dict, List, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
 
+from backend.rag.bm25_index import get_bm25_index
+from backend.rag.rbac import ROLE_DOCUMENT_MAP, role_metadata_key
+from backend.rag.retrieval_batcher import RETRIEVAL_BATCHING, batched_search
+
+# Fuse dense results with BM25 so exact identifiers (Q3 2024, FINEMP1042, service names) match.
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+# Candidates taken from each ranker per requested result before fusion.
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "4"))
+# Standard RRF damping constant; larger values flatten the rank contribution.
+RRF_K = int(os.getenv("RRF_K", "60"))
+
 def role_allowed(doc: Document, user_role: str) -> bool:
     roles = {
         r.strip()
@@ -10,24 +22,100 @@ def role_allowed(doc: Document, user_role: str) -> bool:
     return user_role in roles
 
 
-def secure_search_with_scores(
+# Chroma `where` clause that only matches chunks visible to the role.
+def role_filter(role: str) -> Dict[str, bool]:
+    return {role_metadata_key(role): True}
+
+
+# Reciprocal rank fusion of several ranked lists of chunk ids, best first.
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> List[str]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+# Keeps the dense distance of every fused hit so confidence stays comparable; chunks
+# only BM25 found get the worst dense distance seen, never a better one.
+def _fuse(
+    dense: List[Tuple[Document, float]],
+    lexical: List[Tuple[Document, float]],
+    k: int,
+) -> List[Tuple[Document, float]]:
+    by_id: Dict[str, Tuple[Document, float]] = {}
+    fallback = max((score for _, score in dense), default=1.0)
+
+    for doc, _ in lexical:
+        by_id[doc.metadata["chunk_id"]] = (doc, fallback)
+    for doc, score in dense:
+        by_id[doc.metadata["chunk_id"]] = (doc, score)
+
+    ranking = reciprocal_rank_fusion([
+        [doc.metadata["chunk_id"] for doc, _ in dense],
+        [doc.metadata["chunk_id"] for doc, _ in lexical],
+    ])
+    return [by_id[chunk_id] for chunk_id in ranking[:k]]
+
+
+def dense_search_with_scores(
     vector_store: Chroma,
     query: str,
     role: str,
     k: int = 5,
+    embedding: Optional[List[float]] = None,
 ) -> List[Tuple[Document, float]]:
 
-    results = vector_store.similarity_search_with_score(query, k=k * 5)
+    if role not in ROLE_DOCUMENT_MAP:
+        return []
+
+    # Callers that already embedded the query pass the vector to skip a second forward pass.
+    if embedding is not None and RETRIEVAL_BATCHING:
+        # Concurrent searches for the same role run as one multi-vector search.
+        results = batched_search(vector_store, embedding, k, role_filter(role))
+    elif embedding is not None:
+        results = vector_store.similarity_search_by_vector_with_relevance_scores(
+            embedding,
+            k=k,
+            filter=role_filter(role),
+        )
+    else:
+        results = vector_store.similarity_search_with_score(
+            query,
+            k=k,
+            filter=role_filter(role),
+        )
+
+    # The index filter does the work; this check only guards against stale metadata.
+    return [
+        (doc, score)
+        for doc, score in results
+        if role_allowed(doc, role)
+    ]
 
-    safe_results: List[Tuple[Document, float]] = []
 
-    for doc, score in results:
-        if not role_allowed(doc, role):
-            continue
+def secure_search_with_scores(
+    vector_store: Chroma,
+    query: str,
+    role: str,
+    k: int = 5,
+    embedding: Optional[List[float]] = None,
+    hybrid: Optional[bool] = None,
+) -> List[Tuple[Document, float]]:
+
+    if role not in ROLE_DOCUMENT_MAP:
+        return []
 
-        safe_results.append((doc, score))
+    lexical_index = get_bm25_index() if (HYBRID_SEARCH if hybrid is None else hybrid) else None
+    if lexical_index is None:
+        return dense_search_with_scores(vector_store, query, role, k, embedding)
 
-        if len(safe_results) == k:
-            break
+    candidates = k * HYBRID_CANDIDATES
+    dense = dense_search_with_scores(vector_store, query, role, candidates, embedding)
+    lexical = [
+        (doc, score)
+        for doc, score in lexical_index.search(query, candidates, where=role_filter(role))
+        if role_allowed(doc, role)
+    ]
 
-    return safe_results
+    return _fuse(dense, lexical, k)
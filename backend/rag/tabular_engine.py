@@ -0,0 +1,309 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from langchain_core.documents import Document
+
+from backend.rag.indexer import get_index_version
+from backend.rag.preprocessing import iter_source_files
+from backend.rag.rbac import BASE_DATA_PATH, ROLE_DOCUMENT_MAP, role_metadata, roles_for_department
+
+# Answer aggregate questions over CSV sources with pandas instead of vector search.
+TABULAR_QUERIES = os.getenv("TABULAR_QUERIES", "true").lower() == "true"
+# Largest result table passed to the prompt.
+TABULAR_MAX_ROWS = int(os.getenv("TABULAR_MAX_ROWS", "25"))
+# Text columns with at most this many distinct values can be filtered and grouped on.
+TABULAR_MAX_CATEGORIES = int(os.getenv("TABULAR_MAX_CATEGORIES", "100"))
+# Confidence reported for computed answers. They have no search distance, and the
+# mapping from question to query is a heuristic, so this stays below 1.0.
+TABULAR_CONFIDENCE = float(os.getenv("TABULAR_CONFIDENCE", "0.8"))
+
+# Checked in order; "total headcount" is a count, not a sum.
+_AGGREGATIONS: List[Tuple[str, re.Pattern]] = [
+    ("count", re.compile(r"\b(how many|number of|count|headcount|head count)\b")),
+    ("mean", re.compile(r"\b(average|avg|mean)\b")),
+    ("median", re.compile(r"\bmedian\b")),
+    ("sum", re.compile(r"\b(total|sum)\b")),
+    ("max", re.compile(r"\b(maximum|max|highest|largest)\b")),
+    ("min", re.compile(r"\b(minimum|min|lowest|smallest)\b")),
+]
+
+_ROW_NOUNS = re.compile(r"\b(employees?|people|staff|headcount|head count|workers|records|rows)\b")
+
+_GROUP_BY = re.compile(r"\b(?:by|per|for each|each|across)\s+([a-z][a-z ]*)")
+
+# Words that carry no condition. Any other word the plan does not use is a
+# qualifier it cannot apply ("joined in 2024", "with rating 5"), so the question
+# goes to search rather than getting an unfiltered figure.
+_FILLER = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "s", "what", "whats", "which",
+    "who", "how", "many", "much", "of", "in", "on", "at", "for", "to", "from", "by",
+    "per", "each", "across", "with", "and", "or", "all", "do", "does", "did", "there",
+    "here", "we", "our", "us", "i", "me", "my", "you", "your", "have", "has", "had",
+    "get", "show", "give", "list", "tell", "please", "company", "currently", "current",
+    "overall", "work", "works", "working", "team", "teams", "now",
+}
+
+
+def _phrase(column: str) -> str:
+    return re.sub(r"[\W_]+", " ", column.lower()).strip()
+
+
+def _contains(text: str, phrase: str) -> bool:
+    return re.search(rf"\b{re.escape(phrase)}\b", text) is not None
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text)
+
+
+# Crude stem so "engineering", "engineers" and "Engineer" meet.
+def _stem(word: str) -> str:
+    return re.sub(r"s$", "", re.sub(r"ing$", "", word))
+
+
+# One CSV source loaded as a DataFrame, with the lookups the router needs.
+class Table:
+    def __init__(self, path: Path, department: str, source: str):
+        self.path = path
+        self.department = department
+        self.source = source
+        self.mtime = path.stat().st_mtime_ns
+        self.frame = pd.read_csv(path)
+
+        self.numeric = [
+            column for column in self.frame.columns
+            if pd.api.types.is_numeric_dtype(self.frame[column])
+            and not pd.api.types.is_bool_dtype(self.frame[column])
+        ]
+        self.categorical = [
+            column for column in self.frame.columns
+            if column not in self.numeric
+            and self.frame[column].nunique() <= min(TABULAR_MAX_CATEGORIES, len(self.frame) // 2)
+        ]
+        # Lowercased cell value -> original value, per filterable column.
+        self.values: Dict[str, Dict[str, str]] = {
+            column: {str(v).lower(): v for v in self.frame[column].dropna().unique()}
+            for column in self.categorical
+        }
+        # Stemmed word -> values containing it, so "engineers" selects every
+        # "... Engineer" role. Short words ("qa", "hr") only match whole values.
+        self.value_words: Dict[str, Dict[str, List[str]]] = {}
+        for column, values in self.values.items():
+            words = self.value_words[column] = {}
+            for key, value in values.items():
+                for word in key.split():
+                    if len(word) >= 5:
+                        words.setdefault(_stem(word), []).append(value)
+        self.aliases = self._aliases()
+
+    # "leave_balance" answers to "leave balance"; single words ("salary", "rating")
+    # also work when no other column uses them.
+    def _aliases(self) -> Dict[str, str]:
+        aliases: Dict[str, str] = {}
+        word_owners: Dict[str, List[str]] = {}
+
+        for column in self.frame.columns:
+            phrase = _phrase(str(column))
+            aliases[phrase] = column
+            for word in phrase.split():
+                word_owners.setdefault(word, []).append(column)
+
+        for word, owners in word_owners.items():
+            if len(owners) == 1 and len(word) > 3 and word not in aliases:
+                aliases[word] = owners[0]
+
+        return aliases
+
+    def find_column(self, text: str, candidates: List[str]) -> Optional[str]:
+        matches = [
+            (len(alias), column)
+            for alias, column in self.aliases.items()
+            if column in candidates and _contains(text, alias)
+        ]
+        return max(matches)[1] if matches else None
+
+    # Filters per column plus the question words they used. Whole values (or
+    # their plural) win: "sales managers" selects "Sales Manager" only. Words no
+    # whole value used then match by stem, so "engineering" selects every
+    # "... Engineer" role, but "marketing" matched to the Marketing department
+    # does not also select "Marketing Manager".
+    def find_filters(self, text: str, exclude: Optional[str]) -> Tuple[Dict[str, List[str]], Set[str]]:
+        filters: Dict[str, List[str]] = {}
+        used: Set[str] = set()
+
+        for column, values in self.values.items():
+            if column == exclude:
+                continue
+            for key, value in values.items():
+                phrase = next((p for p in (key, f"{key}s") if _contains(text, p)), None)
+                if phrase:
+                    filters.setdefault(column, []).append(value)
+                    used.update(phrase.split())
+
+        for column in self.values:
+            if column == exclude or column in filters:
+                continue
+            for word in _words(text):
+                if word in used:
+                    continue
+                hits = self.value_words[column].get(_stem(word))
+                if hits:
+                    filters.setdefault(column, []).extend(hits)
+                    used.add(word)
+
+        return {column: sorted(set(values), key=str) for column, values in filters.items()}, used
+
+
+class TabularStore:
+    def __init__(self, base_path: Path = BASE_DATA_PATH):
+        self.base_path = base_path
+        self._tables: Dict[Path, Table] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    # CSV sources, rescanned only when an indexing run changed the corpus (see
+    # indexer.get_index_version); a file is reloaded when its mtime changed.
+    def tables(self) -> List[Table]:
+        version = get_index_version()
+        if version == self._version:
+            return list(self._tables.values())
+
+        directories = [d for d in self.base_path.iterdir() if d.is_dir()]
+        sources = [
+            (file, department, source)
+            for file, department, source in iter_source_files(directories)
+            if file.suffix == ".csv"
+        ]
+
+        with self._lock:
+            tables = {}
+            for file, department, source in sources:
+                table = self._tables.get(file)
+                if table is None or table.mtime != file.stat().st_mtime_ns:
+                    print(f"📊 Loading table {source}...")
+                    table = Table(file, department, source)
+                tables[file] = table
+            self._tables = tables
+            self._version = version
+            return list(tables.values())
+
+
+def _render(frame: pd.DataFrame) -> str:
+    columns = [str(c) for c in frame.columns]
+    rows = [
+        [f"{v:,.2f}" if isinstance(v, float) else str(v) for v in row]
+        for row in frame.itertuples(index=False, name=None)
+    ]
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+# Plans and runs one aggregate over a table, or returns None when the question is
+# not an aggregate this table can answer.
+def _aggregate(table: Table, query: str) -> Optional[str]:
+    text = query.lower()
+
+    aggregation = next((name for name, pattern in _AGGREGATIONS if pattern.search(text)), None)
+    if aggregation is None:
+        return None
+
+    # Counts are row counts; "how many days of sick leave" names a column and is a
+    # policy question, not a count, so it falls back to search.
+    measure = table.find_column(text, table.numeric)
+    if (measure is None) != (aggregation == "count"):
+        return None
+
+    group_by = None
+    match = _GROUP_BY.search(text)
+    if match:
+        group_by = table.find_column(match.group(1), table.categorical)
+
+    # A count must name what this table counts; "how many campaigns ran in
+    # marketing" is not a count of employees in the Marketing department.
+    if aggregation == "count" and not _ROW_NOUNS.search(text):
+        return None
+
+    filters, used = table.find_filters(text, exclude=group_by)
+
+    # Words the plan accounts for; anything else (see _FILLER) is a qualifier it
+    # would silently drop. Every aggregation keyword counts: "total headcount".
+    for pattern in [pattern for _, pattern in _AGGREGATIONS] + [_ROW_NOUNS]:
+        used.update(word for match in pattern.findall(text) for word in match.split())
+    for column in [measure, group_by, *filters]:
+        if column is not None:
+            used.update(_phrase(str(column)).split())
+    if any(word not in used and word not in _FILLER for word in _words(text)):
+        return None
+
+    frame = table.frame
+    for column, values in filters.items():
+        frame = frame[frame[column].isin(values)]
+
+    if aggregation == "count":
+        label = "count"
+        if group_by:
+            result = frame.groupby(group_by).size().rename(label).reset_index()
+        else:
+            result = pd.DataFrame({label: [len(frame)]})
+    else:
+        label = f"{aggregation}_{measure}"
+        if group_by:
+            result = frame.groupby(group_by)[measure].agg(aggregation).rename(label).reset_index()
+        else:
+            result = pd.DataFrame({label: [frame[measure].agg(aggregation)]})
+
+    if group_by:
+        result = result.sort_values(label, ascending=False)
+
+    total_groups = len(result)
+    result = result.head(TABULAR_MAX_ROWS)
+
+    description = f"{aggregation} of {measure or 'rows'}"
+    if group_by:
+        description += f" grouped by {group_by}"
+    if filters:
+        description += " where " + " and ".join(
+            f"{column} in ({', '.join(map(str, values))})" for column, values in filters.items()
+        )
+
+    summary = f"Computed from {table.path.name} ({len(frame)} matching rows): {description}."
+    if total_groups > len(result):
+        summary += f" Showing the top {len(result)} of {total_groups} groups."
+
+    return f"{summary}\n{_render(result)}"
+
+
+# Returns a Document holding the computed result table for aggregate questions
+# over CSV sources the role may read, or None when no table answers the question.
+def answer_tabular(role: str, query: str) -> Optional[Document]:
+    if not TABULAR_QUERIES or role not in ROLE_DOCUMENT_MAP:
+        return None
+
+    for table in tabular_store.tables():
+        if table.department not in ROLE_DOCUMENT_MAP[role]:
+            continue
+
+        content = _aggregate(table, query)
+        if content is None:
+            continue
+
+        return Document(
+            page_content=content,
+            metadata={
+                "chunk_id": f"{table.source}::aggregate",
+                "source_path": table.path.name,
+                "department": table.department,
+                "accessible_roles": ",".join(roles_for_department(table.department)),
+                **role_metadata(table.department),
+            },
+        )
+
+    return None
+
+
+tabular_store = TabularStore()
@@ -1,65 +1,169 @@
-from typing import List
+from typing import Dict, List
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from pathlib import Path
-import shutil
+import numpy as np
 import os
 
+from backend.rag.embedding_engine import EMBED_STREAM_SIZE, EmbeddingEngine
+from backend.rag.model_registry import SharedEmbeddings
+from backend.rag.partitioned_store import DEPARTMENTS, PartitionedVectorStore
+from backend.rag.query_embedding_cache import CachedQueryEmbeddings
+from backend.rag.retrieval_batcher import RETRIEVAL_BATCHING, BatchedQueryEmbeddings
+
 DATA_DIR = Path(os.getenv("DATA_DIR", "backend/vector_db"))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 PERSIST_DIR = str(DATA_DIR / "chroma")
 _COLLECTION_NAME = "company_docs"
 
+# "chroma" (default) or "faiss" for the local quantized ANN index in faiss_store.py.
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+FAISS_DIR = DATA_DIR / "faiss"
+
+# One collection (or FAISS index) per department; a query only searches the
+# departments its role may read. Switching it rebuilds the index.
+VECTOR_PARTITIONS = os.getenv("VECTOR_PARTITIONS", "false").lower() == "true"
+FAISS_PARTITIONS_DIR = DATA_DIR / "faiss_partitions"
+
+# Chroma rejects very large upserts, so writes are split into batches of this size.
+INDEX_BATCH_SIZE = 1000
+
 _embeddings = None
-_vector_store: Chroma | None = None
+_vector_store = None
 
 
 def get_embeddings():
     global _embeddings
     if _embeddings is None:
-        from langchain_huggingface import HuggingFaceEmbeddings
-        print("🔄 Loading embedding model...")
-        _embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2"
-        )
+        # Same model instance and normalization as the build-time EmbeddingEngine,
+        # with repeated queries answered from the LRU instead of the model and
+        # concurrent misses embedded together.
+        embeddings = SharedEmbeddings()
+        if RETRIEVAL_BATCHING:
+            embeddings = BatchedQueryEmbeddings(embeddings)
+        _embeddings = CachedQueryEmbeddings(embeddings)
     return _embeddings
 
-def build_vector_store(documents: List[Document]) -> Chroma:
-    global _vector_store
-
-    print("⚠️ Building vector store locally only...")
+def _open_store(collection_name: str, faiss_dir: Path):
+    if VECTOR_BACKEND == "faiss":
+        from backend.rag.faiss_store import FaissVectorStore
+        return FaissVectorStore(faiss_dir, embedding_function=get_embeddings())
 
-    _vector_store = Chroma.from_documents(
-        documents=documents,
-        embedding=get_embeddings(),
+    return Chroma(
+        embedding_function=get_embeddings(),
         persist_directory=PERSIST_DIR,
-        collection_name=_COLLECTION_NAME,
+        collection_name=collection_name,
     )
 
+def _open_partition(department: str):
+    return _open_store(f"{_COLLECTION_NAME}_{department}", FAISS_PARTITIONS_DIR / department)
+
+def _open_vector_store():
+    global _vector_store
+
+    if _vector_store is None:
+        if VECTOR_PARTITIONS:
+            _vector_store = PartitionedVectorStore(_open_partition, embedding_function=get_embeddings())
+        else:
+            _vector_store = _open_store(_COLLECTION_NAME, FAISS_DIR)
+
     return _vector_store
 
+def _write(store, documents: List[Document], embeddings: np.ndarray) -> None:
+    # FAISS takes the whole stream batch in one write (IVF-PQ trains on the first one).
+    if VECTOR_BACKEND == "faiss":
+        collection, batch_size = store, max(1, len(documents))
+    else:
+        collection, batch_size = store._collection, INDEX_BATCH_SIZE
+
+    for i in range(0, len(documents), batch_size):
+        batch = documents[i:i + batch_size]
+        collection.upsert(
+            ids=[doc.metadata["chunk_id"] for doc in batch],
+            embeddings=embeddings[i:i + batch_size].tolist(),
+            documents=[doc.page_content for doc in batch],
+            metadatas=[doc.metadata for doc in batch],
+        )
+
+# Writes chunks whose vectors were already computed by the EmbeddingEngine.
+# Upserts by `chunk_id`, so re-indexing a file replaces its vectors instead of appending.
+def upsert_embedded(documents: List[Document], embeddings: np.ndarray) -> None:
+    vector_store = _open_vector_store()
+
+    if not VECTOR_PARTITIONS:
+        _write(vector_store, documents, embeddings)
+        return
+
+    # Each chunk goes to the partition of its department folder.
+    by_department: Dict[str, List[int]] = {}
+    for i, doc in enumerate(documents):
+        by_department.setdefault(doc.metadata["department"], []).append(i)
+
+    for department, indices in by_department.items():
+        _write(
+            vector_store.partition(department),
+            [documents[i] for i in indices],
+            embeddings[indices],
+        )
+
+def delete_chunks(chunk_ids: List[str]) -> None:
+    if not chunk_ids:
+        return
 
-def get_vector_store() -> Chroma:
+    vector_store = _open_vector_store()
+
+    for i in range(0, len(chunk_ids), INDEX_BATCH_SIZE):
+        vector_store.delete(ids=chunk_ids[i:i + INDEX_BATCH_SIZE])
+
+# Makes writes durable; Chroma persists on every write, FAISS writes its index file here.
+def save_vector_store() -> None:
+    if VECTOR_BACKEND == "faiss" or VECTOR_PARTITIONS:
+        _open_vector_store().save()
+
+def reset_vector_store() -> None:
+    global _vector_store
+
+    print("🧹 Clearing existing vector store...")
+
+    # Drop the collection rather than the directory: Chroma caches clients per path.
+    _open_vector_store().delete_collection()
+    _vector_store = None
+
+def build_vector_store(documents: List[Document]):
+    print("⚠️ Building vector store locally only...")
+
+    reset_vector_store()
+
+    with EmbeddingEngine() as engine:
+        for i in range(0, len(documents), EMBED_STREAM_SIZE):
+            batch = documents[i:i + EMBED_STREAM_SIZE]
+            upsert_embedded(batch, engine.embed([d.page_content for d in batch]))
+
+    save_vector_store()
+    return _open_vector_store()
+
+
+def get_vector_store():
     global _vector_store
 
     if _vector_store is not None:
+        if VECTOR_BACKEND == "faiss" or VECTOR_PARTITIONS:
+            _vector_store.refresh()
         return _vector_store
 
-    persist_path = Path(PERSIST_DIR)
+    if VECTOR_BACKEND != "faiss":
+        persist_paths = [Path(PERSIST_DIR)]
+    elif VECTOR_PARTITIONS:
+        persist_paths = [FAISS_PARTITIONS_DIR / d / "index.faiss" for d in DEPARTMENTS]
+    else:
+        persist_paths = [FAISS_DIR / "index.faiss"]
 
-    if not persist_path.exists():
+    if not any(path.exists() for path in persist_paths):
         raise RuntimeError(
             "Vector store not found. Build locally before deployment."
         )
 
-    print("📦 Loading existing Chroma DB...")
-
-    _vector_store = Chroma(
-        embedding_function=get_embeddings(),
-        persist_directory=PERSIST_DIR,
-        collection_name=_COLLECTION_NAME,
-    )
+    print(f"📦 Loading existing {VECTOR_BACKEND} vector store...")
 
-    return _vector_store
\ No newline at end of file
+    return _open_vector_store()
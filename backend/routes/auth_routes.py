@@ -1,19 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from backend.auth.auth_utils import create_access_token
-from backend.auth.password_utils import verify_password
-from backend.db.user_repository import get_user_by_username
+from backend.auth.password_utils import PasswordQueueFullError, averify_and_update
+from backend.db.user_repository import get_user_by_username, update_password_hash
 
 router = APIRouter()
 
+# The lookup and the rehash each use a short session of their own; a request-scoped
+# one would hold a pooled connection while the password check waits for the hash pool.
 @router.post("/login")
-def login(form: OAuth2PasswordRequestForm = Depends()):
-    user = get_user_by_username(form.username)
+async def login(form: OAuth2PasswordRequestForm = Depends()):
+    user = await run_in_threadpool(get_user_by_username, form.username)
 
-    if not user or not verify_password(form.password, user.hashed_password):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # bcrypt runs on its own bounded pool so a login burst cannot starve /query.
+    try:
+        valid, new_hash = await averify_and_update(form.password, user.hashed_password)
+    except PasswordQueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent logins, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if new_hash:
+        await run_in_threadpool(update_password_hash, user.username, new_hash)
+
     token = create_access_token(
         {"sub": user.username, "role": user.role}
     )
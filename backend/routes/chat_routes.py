@@ -1,25 +1,40 @@
-from fastapi import APIRouter, Depends
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from backend.auth.dependencies import get_current_user
 from backend.auth.audit_logger import log_access
-from backend.rag.rag_pipeline import rag_pipeline
+from backend.rag.rag_pipeline import PipelineSaturatedError, rag_pipeline
 
 router = APIRouter()
 
 class QueryRequest(BaseModel):
     query: str
 
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/query")
-def query_docs(
+async def query_docs(
     request: QueryRequest,
     user=Depends(get_current_user),
 ):
-    result = rag_pipeline.run(
-        user_role=user.role,
-        query=request.query,
-        k=5,
-    )
+    try:
+        result = await rag_pipeline.arun(
+            user_role=user.role,
+            query=request.query,
+            k=5,
+        )
+    except PipelineSaturatedError:
+        raise _busy()
 
     log_access(
         username=user.username,
@@ -36,3 +51,35 @@ def query_docs(
         "confidence": result["confidence"],
         "citations": result["citations"],
     }
+
+
+# Streams the answer as JSON lines: one "context" event with citations and
+# confidence right after retrieval, then "token" events, then "done".
+@router.post("/query/stream")
+async def query_docs_stream(
+    request: QueryRequest,
+    user=Depends(get_current_user),
+):
+    # Retrieve before the response starts so saturation still maps to a 503.
+    try:
+        retrieval = await rag_pipeline.aretrieve(
+            user_role=user.role,
+            query=request.query,
+            k=5,
+        )
+    except PipelineSaturatedError:
+        raise _busy()
+
+    async def events():
+        async for event in rag_pipeline.astream(user.role, request.query, 5, retrieval):
+            if event["event"] == "context":
+                log_access(
+                    username=user.username,
+                    role=user.role,
+                    query=request.query,
+                    results_count=len(event["citations"]),
+                )
+
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
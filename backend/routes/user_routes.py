@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
 from backend.auth.dependencies import get_current_user
+from backend.db.database import get_db
+from backend.db.bulk_users import detect_format, export_users, parse_users
 from backend.db.user_repository import (
-    get_all_users,
+    bulk_create_users,
+    count_users,
+    get_users_page,
     create_user,
     delete_user,
 )
@@ -18,15 +24,62 @@ class CreateUserRequest(BaseModel):
 
 
 @router.get("/")
-def list_users(user=Depends(get_current_user)):
+def list_users(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     if user.role != "c_level":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return get_all_users()
+    response.headers["X-Total-Count"] = str(count_users(db))
+    return get_users_page(limit, offset, db)
+
+
+# Accepts a CSV (username,role,password header) or JSONL upload and reports
+# per-row errors; valid rows are created in a single transaction.
+@router.post("/bulk")
+def bulk_add_users(
+    file: UploadFile = File(...),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    if user.role != "c_level":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        text = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+    rows = parse_users(text, detect_format(file.filename))
+    return bulk_create_users(rows, db)
+
+
+@router.get("/export")
+def export_all_users(
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    user=Depends(get_current_user),
+):
+    if user.role != "c_level":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_users(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
 
 
 @router.post("/")
-def add_user(request: CreateUserRequest, user=Depends(get_current_user)):
+def add_user(
+    request: CreateUserRequest,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     if user.role != "c_level":
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -34,6 +87,7 @@ def add_user(request: CreateUserRequest, user=Depends(get_current_user)):
         request.username,
         request.role,
         request.password,
+        db,
     )
 
     if not new_user:
@@ -43,11 +97,15 @@ def add_user(request: CreateUserRequest, user=Depends(get_current_user)):
 
 
 @router.delete("/{username}")
-def remove_user(username: str, user=Depends(get_current_user)):
+def remove_user(
+    username: str,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     if user.role != "c_level":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    success = delete_user(username)
+    success = delete_user(username, db)
 
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,4 +1,5 @@
 import os
+import json
 import requests
 from dotenv import load_dotenv
 
@@ -27,12 +28,44 @@ def query_backend(token: str, query: str):
     return response.json()
 
 
-def get_users(token: str):
+# Returns an iterator over the streamed answer events, or None if the request failed.
+def query_backend_stream(token: str, query: str):
     headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/users/", headers=headers)
+    response = requests.post(
+        f"{BASE_URL}/query/stream",
+        headers=headers,
+        json={"query": query},
+        stream=True,
+    )
     if response.status_code != 200:
+        response.close()
         return None
-    return response.json()
+
+    def events():
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+
+    return events()
+
+
+def get_users(token: str, page_size: int = 500):
+    headers = {"Authorization": f"Bearer {token}"}
+    users = []
+    while True:
+        response = requests.get(
+            f"{BASE_URL}/users/",
+            headers=headers,
+            params={"limit": page_size, "offset": len(users)},
+        )
+        if response.status_code != 200:
+            return None
+
+        page = response.json()
+        users.extend(page)
+        if len(page) < page_size:
+            return users
 
 
 def add_user_api(token: str, username: str, role: str, password: str):
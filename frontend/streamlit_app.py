@@ -1,5 +1,5 @@
 import streamlit as st
-from api_client import login_user, query_backend, get_users, add_user_api, delete_user_api
+from api_client import login_user, query_backend_stream, get_users, add_user_api, delete_user_api
 
 # Page Config
 st.set_page_config(page_title="Company Internal Chatbot",page_icon="🏢",layout="wide")
@@ -251,17 +251,28 @@ def chatbot_page():
             {"role": "user", "content": user_input}
         )
 
-        response = query_backend(
+        with st.chat_message("user"):
+            st.markdown(user_input)
+
+        events = query_backend_stream(
             st.session_state.token,
             user_input,
         )
+        citations = []
 
-        if not response:
+        if events is None:
             assistant_text = "❌ Error communicating with backend."
-            citations = []
         else:
-            assistant_text = response.get("answer", "No answer returned.")
-            citations = response.get("citations", [])
+            def answer_tokens():
+                for event in events:
+                    if event["event"] == "context":
+                        citations.extend(event["citations"])
+                    elif event["event"] == "token":
+                        yield event["text"]
+
+            # Render tokens as they arrive instead of waiting for the full answer.
+            with st.chat_message("assistant"):
+                assistant_text = st.write_stream(answer_tokens()) or "No answer returned."
 
         if citations:
             assistant_text += "\n\n---\n**Sources:**"